@@ -440,8 +440,7 @@ class ServiceValidator:
         
         # Test database connection error handling
         # (We'll simulate this by testing with invalid credentials)
-        invalid_config = Config()
-        invalid_config.influxdb_token = "invalid_token"
+        invalid_config = Config(influxdb_token="invalid_token")
         
         try:
             invalid_db = InfluxDBClient(invalid_config)
@@ -3,8 +3,92 @@
 Test script to check what data exists in InfluxDB and help debug dashboard issues.
 """
 
+import os
+import select
 import subprocess
 import json
+import textwrap
+import time
+
+# curl polling limits (seconds)
+QUERY_TIMEOUT = 10.0
+FIRST_BYTE_TIMEOUT = 2.0
+POLL_INTERVAL = 0.1
+
+QUERY_TOTAL = textwrap.dedent('''
+    from(bucket: "default")
+      |> range(start: -24h)
+      |> filter(fn: (r) => r._measurement == "network_telemetry")
+      |> count()
+    ''').strip()
+
+QUERY_FIELDS = textwrap.dedent('''
+    from(bucket: "default")
+      |> range(start: -24h)
+      |> filter(fn: (r) => r._measurement == "network_telemetry")
+      |> keep(columns: ["_field"])
+      |> group()
+      |> distinct(column: "_field")
+    ''').strip()
+
+QUERY_GEOLOCATION = textwrap.dedent('''
+    from(bucket: "default")
+      |> range(start: -24h)
+      |> filter(fn: (r) => r._measurement == "network_telemetry")
+      |> filter(fn: (r) => r._field =~ /target_.*/ or r._field =~ /source_.*/ or r._field == "distance_km")
+      |> count()
+    ''').strip()
+
+QUERY_RECENT = textwrap.dedent('''
+    from(bucket: "default")
+      |> range(start: -1h)
+      |> filter(fn: (r) => r._measurement == "network_telemetry")
+      |> limit(n: 5)
+    ''').strip()
+
+QUERY_BASIC_METRICS = textwrap.dedent('''
+    from(bucket: "default")
+      |> range(start: -24h)
+      |> filter(fn: (r) => r._measurement == "network_telemetry")
+      |> filter(fn: (r) => r._field == "rtt_avg" or r._field == "packet_loss")
+      |> count()
+    ''').strip()
+
+QUERIES = [
+    (QUERY_TOTAL, "Check for any network_telemetry data in last 24 hours"),
+    (QUERY_FIELDS, "List all available fields in network_telemetry"),
+    (QUERY_GEOLOCATION, "Check for geolocation fields (target_*, source_*, distance_km)"),
+    (QUERY_RECENT, "Show recent data sample (last hour)"),
+    (QUERY_BASIC_METRICS, "Check for basic network metrics (rtt_avg, packet_loss)"),
+]
+
+def run_query_command(cmd):
+    """Run a query command, returning early once output ends or the server stalls."""
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    start = time.monotonic()
+    chunks = []
+    
+    try:
+        while True:
+            elapsed = time.monotonic() - start
+            if elapsed > QUERY_TIMEOUT or (not chunks and elapsed > FIRST_BYTE_TIMEOUT):
+                raise TimeoutError("InfluxDB unresponsive")
+            
+            ready, _, _ = select.select([process.stdout], [], [], POLL_INTERVAL)
+            if ready:
+                chunk = os.read(process.stdout.fileno(), 65536)
+                if not chunk:  # EOF - curl has finished writing
+                    break
+                chunks.append(chunk)
+        
+        returncode = process.wait(timeout=POLL_INTERVAL * 10)
+    except (TimeoutError, subprocess.TimeoutExpired):
+        process.kill()
+        process.wait()
+        raise TimeoutError("InfluxDB unresponsive")
+    
+    stderr = process.stderr.read()
+    return returncode, b''.join(chunks).decode(), stderr.decode()
 
 def test_influx_query(query, description):
     """Test a specific InfluxDB query."""
@@ -21,9 +105,9 @@ def test_influx_query(query, description):
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            output = result.stdout.strip()
+        returncode, stdout, stderr = run_query_command(cmd)
+        if returncode == 0:
+            output = stdout.strip()
             if output and not output.startswith('error'):
                 print("✅ Query successful:")
                 # Show first few lines
@@ -39,8 +123,11 @@ def test_influx_query(query, description):
                 return False
         else:
             print("❌ Query failed:")
-            print(f"   {result.stderr}")
+            print(f"   {stderr}")
             return False
+    except TimeoutError as e:
+        print(f"❌ {e}")
+        return False
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
@@ -50,54 +137,8 @@ def main():
     print("🔍 InfluxDB Data Diagnostic Tool")
     print("=" * 60)
     
-    # Test 1: Check if any data exists
-    query1 = '''
-    from(bucket: "default")
-      |> range(start: -24h)
-      |> filter(fn: (r) => r._measurement == "network_telemetry")
-      |> count()
-    '''
-    test_influx_query(query1, "Check for any network_telemetry data in last 24 hours")
-    
-    # Test 2: Check what fields exist
-    query2 = '''
-    from(bucket: "default")
-      |> range(start: -24h)
-      |> filter(fn: (r) => r._measurement == "network_telemetry")
-      |> keep(columns: ["_field"])
-      |> group()
-      |> distinct(column: "_field")
-    '''
-    test_influx_query(query2, "List all available fields in network_telemetry")
-    
-    # Test 3: Check for geolocation fields specifically
-    query3 = '''
-    from(bucket: "default")
-      |> range(start: -24h)
-      |> filter(fn: (r) => r._measurement == "network_telemetry")
-      |> filter(fn: (r) => r._field =~ /target_.*/ or r._field =~ /source_.*/ or r._field == "distance_km")
-      |> count()
-    '''
-    test_influx_query(query3, "Check for geolocation fields (target_*, source_*, distance_km)")
-    
-    # Test 4: Get recent data sample
-    query4 = '''
-    from(bucket: "default")
-      |> range(start: -1h)
-      |> filter(fn: (r) => r._measurement == "network_telemetry")
-      |> limit(n: 5)
-    '''
-    test_influx_query(query4, "Show recent data sample (last hour)")
-    
-    # Test 5: Check for basic network metrics
-    query5 = '''
-    from(bucket: "default")
-      |> range(start: -24h)
-      |> filter(fn: (r) => r._measurement == "network_telemetry")
-      |> filter(fn: (r) => r._field == "rtt_avg" or r._field == "packet_loss")
-      |> count()
-    '''
-    test_influx_query(query5, "Check for basic network metrics (rtt_avg, packet_loss)")
+    for query, description in QUERIES:
+        test_influx_query(query, description)
     
     print("\n" + "=" * 60)
     print("💡 Diagnostic Summary:")
@@ -39,7 +39,7 @@ async def test_influx_data_structure():
             'packets_transmitted': 4,
             'packets_received': 4,
             'hop_count': 12,
-            'route_path': [{'ip': '8.8.8.8', 'rtt': 25.2}],
+            'route_path': {'hops': [1], 'ips': ['8.8.8.8'], 'avg_times': [25.2]},
             'target_ip': '8.8.8.8',
             'source_ip': '203.0.113.1',
             'target_latitude': 37.7749,
@@ -82,8 +82,9 @@ async def test_influx_data_structure():
             'Geolocation': ['target_latitude', 'target_longitude', 'source_latitude', 'source_longitude', 'distance_km']
         }
         
-        print(f"\n📋 FIELD ANALYSIS BY CATEGORY:")
-        print("-" * 60)
+        report = []
+        report.append(f"\n📋 FIELD ANALYSIS BY CATEGORY:")
+        report.append("-" * 60)
         
         total_expected = 0
         total_present = 0
@@ -98,10 +99,10 @@ async def test_influx_data_structure():
             status = "✅" if len(missing_fields) == 0 else "⚠️"
             coverage = (len(present_fields) / len(expected_fields)) * 100
             
-            print(f"{status} {category}: {coverage:.1f}% ({len(present_fields)}/{len(expected_fields)})")
+            report.append(f"{status} {category}: {coverage:.1f}% ({len(present_fields)}/{len(expected_fields)})")
             
             if missing_fields:
-                print(f"    Missing: {', '.join(missing_fields)}")
+                report.append(f"    Missing: {', '.join(missing_fields)}")
             
             # Show sample values for present fields
             if present_fields:
@@ -109,11 +110,12 @@ async def test_influx_data_structure():
                 for field in present_fields[:3]:  # Show first 3 as examples
                     value = processed['fields'][field]
                     sample_values.append(f"{field}={value}")
-                print(f"    Sample: {', '.join(sample_values)}")
-            print()
+                report.append(f"    Sample: {', '.join(sample_values)}")
+            report.append("")
         
         overall_coverage = (total_present / total_expected) * 100
-        print(f"📊 OVERALL COVERAGE: {overall_coverage:.1f}% ({total_present}/{total_expected} fields)")
+        report.append(f"📊 OVERALL COVERAGE: {overall_coverage:.1f}% ({total_present}/{total_expected} fields)")
+        sys.stdout.write("\n".join(report) + "\n")
         
         # Test InfluxDB line protocol conversion
         print(f"\n🗄️  TESTING INFLUXDB LINE PROTOCOL:")
@@ -1,39 +1,172 @@
 #!/usr/bin/env python3
-"""Simple telemetry data storage for testing."""
+"""Simple telemetry data storage for testing.
 
+Metrics are appended as JSON lines to hourly files named
+``metrics-YYYYMMDDHH-NNN.jsonl``; a new sequence number is started when a
+file grows past ``rotate_bytes``. Records are buffered in memory and written
+with a single ``writev`` once ``FLUSH_RECORDS`` are pending or
+``FLUSH_INTERVAL`` seconds have passed since the last flush. Records still
+pending are written by ``close()``, which runs when the store is used as a
+context manager and otherwise at interpreter exit; a process that is killed
+loses at most the pending records.
+
+Written data is synced to disk with ``fdatasync`` once ``sync_every_bytes``
+have accumulated or ``sync_interval_s`` seconds have passed, bounding what a
+crash can lose without paying for a sync on every record. The defaults can be
+overridden with ``SIMPLE_STORE_FSYNC_BYTES`` and ``SIMPLE_STORE_FSYNC_INTERVAL``.
+"""
+
+import atexit
 import json
+import mmap
 import os
-from datetime import datetime
+import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+ROTATE_BYTES = 64 * 1024 * 1024  # Start a new file after 64 MiB
+FLUSH_RECORDS = 32  # Pending records that trigger a write
+FLUSH_INTERVAL = 0.1  # Seconds a record may wait in memory
+SYNC_EVERY_BYTES = int(os.getenv('SIMPLE_STORE_FSYNC_BYTES', 256 * 1024))
+SYNC_INTERVAL = float(os.getenv('SIMPLE_STORE_FSYNC_INTERVAL', 1.0))
+
+# fdatasync skips metadata-only updates; not every platform provides it
+_datasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _encode_metrics(metrics):
+    """Encode metrics as a single JSON line."""
+    if orjson is not None:
+        return orjson.dumps(metrics, default=str) + b'\n'
+    return json.dumps(metrics, separators=(',', ':'), default=str).encode() + b'\n'
+
 
 class SimpleDataStore:
-    def __init__(self, data_dir="telemetry_data"):
+    def __init__(self, data_dir="telemetry_data", rotate_bytes=ROTATE_BYTES,
+                 sync_every_bytes=SYNC_EVERY_BYTES, sync_interval_s=SYNC_INTERVAL):
         self.data_dir = data_dir
+        self.rotate_bytes = rotate_bytes
+        self.sync_every_bytes = sync_every_bytes
+        self.sync_interval_s = sync_interval_s
         os.makedirs(data_dir, exist_ok=True)
-    
+        self._file_prefix = os.path.join(data_dir, "metrics-")
+        self._fd = None
+        self._path = None
+        self._hour = None
+        self._seq = 0
+        self._size = 0
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._bytes_since_sync = 0
+        self._last_sync = self._last_flush
+        # Write out buffered records at exit for stores that are never closed
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        atexit.unregister(self.close)
+
+    def _roll_file(self):
+        """Make sure the current file is open and within its hour and size limit."""
+        hour = time.strftime('%Y%m%d%H')
+        if self._fd is not None and hour == self._hour and self._size < self.rotate_bytes:
+            return
+
+        seq = self._seq + 1 if hour == self._hour else 0
+        self.close()
+
+        # Reuse an existing file for this hour if it still has room (e.g. after a restart)
+        while True:
+            path = f"{self._file_prefix}{hour}-{seq:03d}.jsonl"
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            size = os.fstat(fd).st_size
+            if size < self.rotate_bytes:
+                break
+            os.close(fd)
+            seq += 1
+
+        self._fd, self._path, self._hour, self._seq, self._size = fd, path, hour, seq, size
+
     def store_metrics(self, metrics):
-        """Store metrics to a JSON file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"metrics_{timestamp}.json"
-        filepath = os.path.join(self.data_dir, filename)
-        
-        with open(filepath, 'w') as f:
-            json.dump(metrics, f, indent=2, default=str)
-        
-        print(f"Metrics stored: {filepath}")
+        """Append metrics to the current JSON lines file."""
+        self._roll_file()
+        line = _encode_metrics(metrics)
+        self._pending.append(line)
+        self._size += len(line)
+        if (len(self._pending) >= FLUSH_RECORDS
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL):
+            self.flush()
         return True
-    
+
+    def flush(self):
+        """Write all pending records to the current file in one syscall."""
+        now = time.monotonic()
+        if self._pending:
+            self._bytes_since_sync += os.writev(self._fd, self._pending)
+            self._pending.clear()
+        self._last_flush = now
+        if self._bytes_since_sync and (
+                self._bytes_since_sync >= self.sync_every_bytes
+                or now - self._last_sync >= self.sync_interval_s):
+            self.sync()
+
+    def sync(self):
+        """Force written records to disk."""
+        _datasync(self._fd)
+        self._bytes_since_sync = 0
+        self._last_sync = time.monotonic()
+
     def get_recent_metrics(self, count=10):
-        """Get recent metrics files."""
-        files = []
-        for f in os.listdir(self.data_dir):
-            if f.startswith('metrics_') and f.endswith('.json'):
-                files.append(f)
-        
-        files.sort(reverse=True)
-        return files[:count]
+        """Get the most recent metrics records, newest first."""
+        if self._fd is not None:
+            self.flush()
+        with os.scandir(self.data_dir) as entries:
+            names = sorted(
+                (entry.name for entry in entries
+                 if entry.name.startswith('metrics-') and entry.name.endswith('.jsonl')),
+                reverse=True
+            )
+
+        records = []
+        for name in names:
+            if len(records) >= count:
+                break
+            records.extend(self._read_last_records(os.path.join(self.data_dir, name), count - len(records)))
+        return records
+
+    def _read_last_records(self, path, count):
+        """Read up to ``count`` records from the end of a file, newest first."""
+        records = []
+        with open(path, 'rb') as f:
+            end = os.fstat(f.fileno()).st_size
+            if end == 0:
+                return records
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while end > 0 and len(records) < count:
+                    start = data.rfind(b'\n', 0, end - 1) + 1
+                    line = data[start:end].strip()
+                    if line:
+                        records.append(json.loads(line))
+                    end = start
+        return records
+
+    def close(self):
+        """Close the current metrics file."""
+        if self._fd is not None:
+            self.flush()
+            if self._bytes_since_sync:
+                self.sync()
+            os.close(self._fd)
+            self._fd = None
 
 if __name__ == "__main__":
-    store = SimpleDataStore()
-    print(f"Data directory: {store.data_dir}")
-    recent = store.get_recent_metrics()
-    print(f"Recent files: {len(recent)}")
+    with SimpleDataStore() as store:
+        print(f"Data directory: {store.data_dir}")
+        recent = store.get_recent_metrics()
+        print(f"Recent records: {len(recent)}")
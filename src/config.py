@@ -4,79 +4,139 @@ Configuration module for Network Telemetry Service.
 Handles all configuration parameters from environment variables with sensible defaults.
 """
 
+import functools
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+def _env(name: str, default: Optional[str] = None):
+    """Build a default factory that reads a string environment variable."""
+    return lambda: os.getenv(name, default)
+
+
+def _env_int(name: str, default: str):
+    """Build a default factory that reads an integer environment variable."""
+    return lambda: int(os.getenv(name, default))
+
+
+# Validation rules checked in order: (attribute, predicate, error message)
+_RULES = (
+    ("target_fqdn", bool, "TARGET_FQDN cannot be empty"),
+    ("monitoring_interval", lambda v: v >= 10, "MONITORING_INTERVAL must be at least 10 seconds"),
+    ("ping_count", lambda v: v >= 1, "PING_COUNT must be at least 1"),
+    ("ping_timeout", lambda v: v >= 1, "PING_TIMEOUT must be at least 1 second"),
+    ("ping_timeout_total", lambda v: v >= 1, "PING_TIMEOUT_TOTAL must be at least 1 second"),
+    ("traceroute_timeout_total", lambda v: v >= 1, "TRACEROUTE_TIMEOUT_TOTAL must be at least 1 second"),
+    ("geo_timeout_total", lambda v: v >= 1, "GEO_TIMEOUT_TOTAL must be at least 1 second"),
+    ("geo_prefix_bits", lambda v: 8 <= v <= 32, "GEO_PREFIX_BITS must be between 8 and 32"),
+    ("sample_concurrency", lambda v: v >= 1, "SAMPLE_CONCURRENCY must be at least 1"),
+    ("connectivity_cache_ttl", lambda v: v >= 0, "CONNECTIVITY_CACHE_TTL cannot be negative"),
+    ("influxdb_url", bool, "INFLUXDB_URL cannot be empty"),
+    ("influxdb_org", bool, "INFLUXDB_ORG cannot be empty"),
+    ("influxdb_bucket", bool, "INFLUXDB_BUCKET cannot be empty"),
+    ("influxdb_batch_size", lambda v: v >= 1, "MONITORING_BATCH_SIZE must be at least 1"),
+    ("influxdb_flush_interval_ms", lambda v: v >= 1, "MONITORING_FLUSH_MS must be at least 1 millisecond"),
+    ("influxdb_pool_size", lambda v: v >= 1, "INFLUXDB_POOL_SIZE must be at least 1"),
+)
+
+# Template for Config.__str__ (the token is deliberately left out)
+_CONFIG_FMT = (
+    "Configuration:\n"
+    "  Target FQDN: %s\n"
+    "  Monitoring Interval: %ss\n"
+    "  Ping Count: %s\n"
+    "  Ping Timeout: %ss\n"
+    "  Collection Timeouts: ping %ss, traceroute %ss, geolocation %ss\n"
+    "  Geolocation Cache Prefix: /%s\n"
+    "  Sample Concurrency: %s\n"
+    "  Connectivity Cache TTL: %ss\n"
+    "  InfluxDB URL: %s\n"
+    "  InfluxDB Org: %s\n"
+    "  InfluxDB Bucket: %s\n"
+    "  InfluxDB Batch Size: %s\n"
+    "  InfluxDB Flush Interval: %sms\n"
+    "  InfluxDB Pool Size: %s\n"
+    "  Log Level: %s\n"
+)
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Configuration class for the network telemetry service."""
+    """
+    Configuration class for the network telemetry service.
+    
+    Each field defaults to its environment variable; keyword arguments
+    override the environment. Instances are immutable so a single parsed
+    configuration can be shared safely (see get_config()).
+    """
     
     # Network monitoring configuration
-    target_fqdn: str
-    monitoring_interval: int
-    ping_count: int
-    ping_timeout: int
+    target_fqdn: str = field(default_factory=_env("TARGET_FQDN", "google.com"))
+    monitoring_interval: int = field(default_factory=_env_int("MONITORING_INTERVAL", "60"))
+    ping_count: int = field(default_factory=_env_int("PING_COUNT", "5"))
+    ping_timeout: int = field(default_factory=_env_int("PING_TIMEOUT", "10"))
+    
+    # Upper bounds on each part of a collection cycle
+    ping_timeout_total: int = field(default_factory=_env_int("PING_TIMEOUT_TOTAL", "30"))
+    traceroute_timeout_total: int = field(default_factory=_env_int("TRACEROUTE_TIMEOUT_TOTAL", "60"))
+    geo_timeout_total: int = field(default_factory=_env_int("GEO_TIMEOUT_TOTAL", "15"))
+    
+    # IPv4 geolocation is cached per network of this prefix length (32 = per address)
+    geo_prefix_bits: int = field(default_factory=_env_int("GEO_PREFIX_BITS", "24"))
+    
+    # Most targets measured at once by a multi-target collection
+    sample_concurrency: int = field(default_factory=_env_int("SAMPLE_CONCURRENCY", "5"))
+    
+    # How long a connectivity test result is reused (0 = always re-test)
+    connectivity_cache_ttl: int = field(default_factory=_env_int("CONNECTIVITY_CACHE_TTL", "30"))
     
     # InfluxDB configuration
-    influxdb_url: str
-    influxdb_token: Optional[str]
-    influxdb_org: str
-    influxdb_bucket: str
+    influxdb_url: str = field(default_factory=_env("INFLUXDB_URL", "http://localhost:8086"))
+    influxdb_token: Optional[str] = field(default_factory=_env("INFLUXDB_TOKEN"), repr=False)
+    influxdb_org: str = field(default_factory=_env("INFLUXDB_ORG", "nflx"))
+    influxdb_bucket: str = field(default_factory=_env("INFLUXDB_BUCKET", "default"))
+    influxdb_batch_size: int = field(default_factory=_env_int("MONITORING_BATCH_SIZE", "500"))
+    influxdb_flush_interval_ms: int = field(default_factory=_env_int("MONITORING_FLUSH_MS", "1000"))
+    influxdb_pool_size: int = field(default_factory=_env_int("INFLUXDB_POOL_SIZE", "10"))
     
     # Logging configuration
-    log_level: str
+    log_level: str = field(default_factory=_env("LOG_LEVEL", "INFO"))
     
-    def __init__(self):
-        """Initialize configuration from environment variables."""
-        self.target_fqdn = os.getenv("TARGET_FQDN", "google.com")
-        self.monitoring_interval = int(os.getenv("MONITORING_INTERVAL", "60"))
-        self.ping_count = int(os.getenv("PING_COUNT", "5"))
-        self.ping_timeout = int(os.getenv("PING_TIMEOUT", "10"))
-        
-        self.influxdb_url = os.getenv("INFLUXDB_URL", "http://localhost:8086")
-        self.influxdb_token = os.getenv("INFLUXDB_TOKEN")
-        self.influxdb_org = os.getenv("INFLUXDB_ORG", "nflx")
-        self.influxdb_bucket = os.getenv("INFLUXDB_BUCKET", "default")
-        
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
-        
-        # Validate configuration
+    def __post_init__(self):
+        """Validate configuration after construction."""
         self._validate()
     
     def _validate(self):
         """Validate configuration parameters."""
-        if not self.target_fqdn:
-            raise ValueError("TARGET_FQDN cannot be empty")
-        
-        if self.monitoring_interval < 10:
-            raise ValueError("MONITORING_INTERVAL must be at least 10 seconds")
-        
-        if self.ping_count < 1:
-            raise ValueError("PING_COUNT must be at least 1")
-        
-        if self.ping_timeout < 1:
-            raise ValueError("PING_TIMEOUT must be at least 1 second")
-        
-        if not self.influxdb_url:
-            raise ValueError("INFLUXDB_URL cannot be empty")
-        
-        if not self.influxdb_org:
-            raise ValueError("INFLUXDB_ORG cannot be empty")
-        
-        if not self.influxdb_bucket:
-            raise ValueError("INFLUXDB_BUCKET cannot be empty")
+        for name, is_valid, message in _RULES:
+            if not is_valid(getattr(self, name)):
+                raise ValueError(message)
     
     def __str__(self) -> str:
         """String representation of configuration (excluding sensitive data)."""
-        return f"""Configuration:
-  Target FQDN: {self.target_fqdn}
-  Monitoring Interval: {self.monitoring_interval}s
-  Ping Count: {self.ping_count}
-  Ping Timeout: {self.ping_timeout}s
-  InfluxDB URL: {self.influxdb_url}
-  InfluxDB Org: {self.influxdb_org}
-  InfluxDB Bucket: {self.influxdb_bucket}
-  Log Level: {self.log_level}
-"""
+        return _CONFIG_FMT % (
+            self.target_fqdn,
+            self.monitoring_interval,
+            self.ping_count,
+            self.ping_timeout,
+            self.ping_timeout_total,
+            self.traceroute_timeout_total,
+            self.geo_timeout_total,
+            self.geo_prefix_bits,
+            self.sample_concurrency,
+            self.connectivity_cache_ttl,
+            self.influxdb_url,
+            self.influxdb_org,
+            self.influxdb_bucket,
+            self.influxdb_batch_size,
+            self.influxdb_flush_interval_ms,
+            self.influxdb_pool_size,
+            self.log_level,
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the process-wide configuration, parsed from the environment once."""
+    return Config()
@@ -6,16 +6,175 @@ Handles connection, authentication, and data operations with InfluxDB.
 
 import asyncio
 import logging
+import os
+import re
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Tuple, Union
+
+try:
+    from asyncinotify import Inotify, Mask
+except ImportError:  # Optional; token discovery falls back to polling
+    Inotify = None
 
 from influxdb_client import InfluxDBClient as InfluxClient
-from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.client.write_api import WriteOptions
 from influxdb_client.rest import ApiException
 
 from .config import Config
 
 
+# Line protocol escaping: measurement names escape commas and spaces, tag
+# keys/values and field keys also escape equals signs, and string field
+# values escape double quotes and backslashes.
+_MEASUREMENT_ESCAPES = str.maketrans({',': r'\,', ' ': r'\ '})
+_KEY_ESCAPES = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ '})
+_STRING_ESCAPES = str.maketrans({'"': r'\"', '\\': r'\\'})
+
+# InfluxDB CLI config written on first boot, e.g. `token = "..."` (tokens
+# shorter than 11 characters are ignored as placeholders)
+_INFLUX_CONFIGS_PATH = '/etc/influxdb2/influx-configs'
+_TOKEN_PATTERN = re.compile(rb'^[ \t]*token[ \t]*=[ \t]*"?([^"\n]{11,})"?', re.M)
+_TOKEN_WAIT_TIMEOUT = 60.0
+_TOKEN_RETRY_INITIAL_DELAY = 0.5
+_TOKEN_RETRY_MAX_DELAY = 8.0
+
+# Successful connection checks, keyed like _shared_clients, are trusted for
+# this many seconds so repeated initialize() calls don't re-ping the server
+_CONNECTION_CHECK_TTL = 30.0
+_connection_checked_at: Dict[tuple, float] = {}
+
+# Flux query for get_recent_metrics; {bucket} is filled in once per client and
+# %d (hours) per call. Results are cached for a few seconds per window.
+_RECENT_METRICS_QUERY = (
+    'from(bucket: "{bucket}")'
+    ' |> range(start: -%dh)'
+    ' |> filter(fn: (r) => r._measurement == "network_telemetry")'
+    ' |> sort(columns: ["_time"], desc: true)'
+    ' |> limit(n: 100)'
+)
+_RECENT_METRICS_TTL = 5.0
+
+# (url, org, bucket) combinations already confirmed to exist in this process
+_verified_buckets: set = set()
+
+# Process-wide InfluxDB clients keyed by connection parameters.
+# Each entry holds [client, reference_count] so the connection pool is
+# shared by every InfluxDBClient and closed when the last user releases it.
+_shared_clients: Dict[tuple, list] = {}
+
+
+def _acquire_shared_client(key: tuple, **client_kwargs) -> InfluxClient:
+    """Return the shared client for ``key``, creating it on first use."""
+    entry = _shared_clients.get(key)
+    if entry is None:
+        entry = [InfluxClient(enable_gzip=True, **client_kwargs), 0]
+        _shared_clients[key] = entry
+    entry[1] += 1
+    return entry[0]
+
+
+def _release_shared_client(key: tuple) -> None:
+    """Drop a reference to a shared client, closing it when unused."""
+    entry = _shared_clients.get(key)
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del _shared_clients[key]
+        entry[0].close()
+
+
+# Upper bound on memoized key prefixes; the collector emits a fixed schema so
+# this is only reached if callers generate keys dynamically
+_MAX_KEY_PREFIXES = 4096
+
+# The encoder's reusable parts buffer is replaced if a point grows it past this
+_MAX_BUFFER_PARTS = 4096
+
+# Upper bound on cached series keys (escaped measurement plus tag set)
+_MAX_SERIES_KEYS = 1024
+
+
+class _LineProtocolEncoder:
+    """Encodes measurement/tags/fields into InfluxDB line protocol."""
+    
+    def __init__(self):
+        # Escaped "key=" prefixes; tag and field names repeat on every point
+        self._key_prefixes: Dict[str, str] = {}
+        # Reused across calls to avoid allocating a new list per point
+        self._parts: List[str] = []
+        # Encoded "measurement,tag=value,..." prefixes; a target's tags are
+        # the same on every point, so each series is escaped only once
+        self._series_keys: Dict[tuple, str] = {}
+    
+    def _key_prefix(self, key: str) -> str:
+        """Return the escaped ``key=`` prefix, computing it on first use."""
+        prefix = self._key_prefixes.get(key)
+        if prefix is None:
+            if len(self._key_prefixes) >= _MAX_KEY_PREFIXES:
+                self._key_prefixes.clear()
+            prefix = self._key_prefixes[key] = key.translate(_KEY_ESCAPES) + '='
+        return prefix
+    
+    def preload(self, keys: Iterable[str]):
+        """Escape a known schema's keys up front so the first points hit the cache."""
+        for key in keys:
+            self._key_prefix(key)
+    
+    def _series_key(self, measurement: str, tags: Dict[str, Any]) -> str:
+        """Return the escaped measurement and tag set, computing it on first use."""
+        try:
+            cache_key = (measurement, *tags.items())
+            series_key = self._series_keys.get(cache_key)
+        except TypeError:  # Unhashable tag value; encode without caching
+            cache_key = series_key = None
+        
+        if series_key is None:
+            key_prefix = self._key_prefix
+            series_key = measurement.translate(_MEASUREMENT_ESCAPES) + ''.join(
+                f",{key_prefix(key)}{str(value).translate(_KEY_ESCAPES)}"
+                for key, value in tags.items() if value is not None
+            )
+            if cache_key is not None:
+                if len(self._series_keys) >= _MAX_SERIES_KEYS:
+                    self._series_keys.clear()
+                self._series_keys[cache_key] = series_key
+        return series_key
+    
+    def encode(self, measurement: str, tags: Dict[str, Any],
+               fields: Dict[str, Any], timestamp_ns: int) -> Optional[str]:
+        """Return a line protocol string, or None if there are no fields."""
+        key_prefix = self._key_prefix
+        
+        # Build the whole line in one buffer and join once at the end
+        parts = self._parts
+        parts.clear()
+        parts.append(self._series_key(measurement, tags))
+        
+        fields_start = len(parts)
+        separator = ' '
+        for key, value in fields.items():
+            if value is not None:
+                parts.append(separator)
+                parts.append(key_prefix(key))
+                if isinstance(value, str):
+                    parts.append(f'"{value.translate(_STRING_ESCAPES)}"')
+                else:
+                    parts.append(str(value))
+                separator = ','
+        
+        if len(parts) == fields_start:
+            return None
+        
+        parts.append(f" {timestamp_ns}")
+        line = ''.join(parts)
+        
+        # Don't keep an unusually large point's buffer alive
+        if len(parts) > _MAX_BUFFER_PARTS:
+            self._parts = []
+        return line
+
+
 class InfluxDBClient:
     """InfluxDB client for storing network telemetry data."""
     
@@ -24,10 +183,54 @@ class InfluxDBClient:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.client: Optional[InfluxClient] = None
+        self._client_key: Optional[tuple] = None
         self.write_api = None
         self.query_api = None
         self.token: Optional[str] = None
         
+        # The bucket is fixed for the client's lifetime, so only the window varies
+        self._recent_metrics_query = _RECENT_METRICS_QUERY.replace(
+            '{bucket}', self.config.influxdb_bucket.replace('%', '%%')
+        )
+        self._recent_metrics_cache: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._encoder = _LineProtocolEncoder()
+        
+    def _create_write_api(self):
+        """Create a batching write API that flushes in the background."""
+        write_options = WriteOptions(
+            batch_size=self.config.influxdb_batch_size,
+            flush_interval=self.config.influxdb_flush_interval_ms,
+            jitter_interval=200,
+            retry_interval=5000
+        )
+        return self.client.write_api(
+            write_options=write_options,
+            success_callback=self._on_write_success,
+            error_callback=self._on_write_error
+        )
+    
+    def _use_client(self, key: tuple, **client_kwargs) -> InfluxClient:
+        """Switch to the shared client for ``key``, releasing any previous one."""
+        if self._client_key is not None:
+            _release_shared_client(self._client_key)
+        self.client = _acquire_shared_client(
+            key,
+            url=self.config.influxdb_url,
+            org=self.config.influxdb_org,
+            connection_pool_maxsize=self.config.influxdb_pool_size,
+            **client_kwargs
+        )
+        self._client_key = key
+        return self.client
+    
+    def _on_write_success(self, conf: tuple, data: str):
+        """Handle a successfully flushed batch."""
+        self.logger.debug("Flushed batch to InfluxDB bucket '%s'", conf[0])
+    
+    def _on_write_error(self, conf: tuple, data: str, exception: Exception):
+        """Handle a batch that failed to flush."""
+        self.logger.error(f"Error writing batch to InfluxDB: {exception}")
+    
     async def initialize(self) -> bool:
         """
         Initialize connection to InfluxDB.
@@ -48,33 +251,31 @@ class InfluxDBClient:
                 self.logger.info("No token found, attempting basic auth connection for localhost")
                 try:
                     # Initialize client without token for basic auth
-                    self.client = InfluxClient(
-                        url=self.config.influxdb_url,
+                    self._use_client(
+                        (self.config.influxdb_url, self.config.influxdb_org, 'basic', 'admin'),
                         username="admin",  # Default username
-                        password="admin123!",  # Match Grafana datasource password
-                        org=self.config.influxdb_org
+                        password="admin123!"  # Match Grafana datasource password
                     )
                     
                     # Test connection
                     if await self._test_connection():
-                        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+                        self.write_api = self._create_write_api()
                         self.query_api = self.client.query_api()
                         self.logger.info("InfluxDB client initialized with basic auth")
                         return True
                 except Exception as e:
-                    self.logger.debug(f"Basic auth failed: {e}")
+                    self.logger.debug("Basic auth failed: %s", e)
             
             # Try token-based authentication
             if self.token:
-                self.client = InfluxClient(
-                    url=self.config.influxdb_url,
-                    token=self.token,
-                    org=self.config.influxdb_org
+                self._use_client(
+                    (self.config.influxdb_url, self.config.influxdb_org, 'token', self.token),
+                    token=self.token
                 )
                 
                 # Test connection
                 if await self._test_connection():
-                    self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+                    self.write_api = self._create_write_api()
                     self.query_api = self.client.query_api()
                     await self._ensure_bucket_exists()
                     self.logger.info("InfluxDB client initialized with token auth")
@@ -95,24 +296,51 @@ class InfluxDBClient:
             Token string if found, None otherwise.
         """
         try:
-            # Wait for InfluxDB to be ready and generate token
-            for attempt in range(30):  # 30 attempts, 2 seconds each = 60 seconds max
-                try:
-                    # Try to read token from config file
-                    with open('/etc/influxdb2/influx-configs', 'r') as f:
-                        content = f.read()
-                        # Look for token in the config
-                        for line in content.split('\n'):
-                            if 'token' in line and '=' in line:
-                                token = line.split('=')[1].strip().strip('"')
-                                if token and len(token) > 10:  # Basic token validation
-                                    self.logger.info("Found InfluxDB token in config file")
-                                    return token
-                except FileNotFoundError:
-                    pass
-                
-                self.logger.debug(f"Waiting for InfluxDB token... (attempt {attempt + 1}/30)")
-                await asyncio.sleep(2)
+            # Wait for InfluxDB to generate the token, waking on file change
+            # notifications when available and backing off between checks
+            # otherwise; the file is only re-read when it has actually changed
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + _TOKEN_WAIT_TIMEOUT
+            delay = _TOKEN_RETRY_INITIAL_DELAY
+            last_mtime = None
+            attempt = 0
+            changed = asyncio.Event()
+            watcher = self._watch_token_file(changed)
+            
+            try:
+                while True:
+                    attempt += 1
+                    changed.clear()
+                    try:
+                        mtime = os.stat(_INFLUX_CONFIGS_PATH).st_mtime_ns
+                        if mtime != last_mtime:
+                            last_mtime = mtime
+                            with open(_INFLUX_CONFIGS_PATH, 'rb') as f:
+                                match = _TOKEN_PATTERN.search(f.read())
+                            if match:
+                                self.logger.info("Found InfluxDB token in config file")
+                                return match.group(1).strip().decode()
+                    except FileNotFoundError:
+                        pass
+                    
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    
+                    if watcher is not None and not watcher.done():
+                        # Still re-check periodically in case an event is missed
+                        self.logger.debug("Waiting for InfluxDB token file to change... (attempt %d)", attempt)
+                        try:
+                            await asyncio.wait_for(changed.wait(), min(_TOKEN_RETRY_MAX_DELAY, remaining))
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        self.logger.debug("Waiting for InfluxDB token... (attempt %d, retry in %.1fs)", attempt, delay)
+                        await asyncio.sleep(min(delay, remaining))
+                        delay = min(delay * 2, _TOKEN_RETRY_MAX_DELAY)
+            finally:
+                if watcher is not None:
+                    watcher.cancel()
             
             self.logger.error("Could not find InfluxDB token in config file")
             return None
@@ -121,6 +349,40 @@ class InfluxDBClient:
             self.logger.error(f"Error getting token from config: {e}")
             return None
     
+    def _watch_token_file(self, changed: asyncio.Event) -> Optional[asyncio.Task]:
+        """
+        Start a task that sets ``changed`` whenever the InfluxDB config file is written.
+        
+        Args:
+            changed: Event to set on each write
+            
+        Returns:
+            The watcher task, or None if file notifications are unavailable.
+        """
+        if Inotify is None:
+            return None
+        
+        directory, filename = os.path.split(_INFLUX_CONFIGS_PATH)
+        try:
+            inotify = Inotify()
+        except Exception as e:
+            self.logger.debug("File notifications unavailable, polling for token: %s", e)
+            return None
+        try:
+            inotify.add_watch(directory, Mask.CREATE | Mask.CLOSE_WRITE | Mask.MOVED_TO)
+        except Exception as e:
+            inotify.close()
+            self.logger.debug("Cannot watch %s, polling for token: %s", directory, e)
+            return None
+        
+        async def watch():
+            with inotify:
+                async for event in inotify:
+                    if event.name is not None and event.name.name == filename:
+                        changed.set()
+        
+        return asyncio.create_task(watch())
+    
     async def _test_connection(self) -> bool:
         """
         Test connection to InfluxDB.
@@ -128,31 +390,48 @@ class InfluxDBClient:
         Returns:
             True if connection successful, False otherwise.
         """
+        return await self.ping()
+    
+    async def ping(self, force: bool = False) -> bool:
+        """
+        Check that InfluxDB is reachable.
+        
+        Args:
+            force: Always contact the server, even if this connection was
+                verified within the last _CONNECTION_CHECK_TTL seconds
+            
+        Returns:
+            True if the server answered, False otherwise.
+        """
+        # Skip the round-trip if this connection was verified recently
+        if not force:
+            checked_at = _connection_checked_at.get(self._client_key)
+            if checked_at is not None and time.monotonic() - checked_at < _CONNECTION_CHECK_TTL:
+                return True
+        
         try:
-            # Simple ping test for basic connectivity
-            import requests
-            response = requests.get(f"{self.config.influxdb_url}/ping", timeout=5)
-            if response.status_code == 204:
+            # Ping through the shared client so the request reuses its connection pool
+            loop = asyncio.get_running_loop()
+            if await loop.run_in_executor(None, self.client.ping):
                 self.logger.info("InfluxDB connection test successful")
+                _connection_checked_at[self._client_key] = time.monotonic()
                 return True
-            else:
-                self.logger.warning(f"InfluxDB ping failed: {response.status_code}, trying client health check")
-                # Fall back to client health check
-                try:
-                    health = self.client.health()
-                    if health.status == "pass":
-                        self.logger.info("InfluxDB client health check successful")
-                        return True
-                    else:
-                        self.logger.error(f"InfluxDB health check failed: {health.status}")
-                        return False
-                except Exception:
-                    # If health check fails, assume basic connectivity works
-                    self.logger.info("InfluxDB basic connectivity assumed working")
-                    return True
+            
+            self.logger.warning("InfluxDB ping failed, trying client health check")
+            # Fall back to client health check
+            health = await loop.run_in_executor(None, self.client.health)
+            if health.status == "pass":
+                self.logger.info("InfluxDB client health check successful")
+                _connection_checked_at[self._client_key] = time.monotonic()
+                return True
+            
+            self.logger.error(f"InfluxDB health check failed: {health.status}")
         except Exception as e:
             self.logger.error(f"InfluxDB connection test failed: {e}")
-            return False
+        
+        # Don't let an earlier success vouch for a connection that just failed
+        _connection_checked_at.pop(self._client_key, None)
+        return False
     
     async def _ensure_bucket_exists(self) -> bool:
         """
@@ -161,15 +440,17 @@ class InfluxDBClient:
         Returns:
             True if bucket exists or was created, False otherwise.
         """
+        bucket_key = (self.config.influxdb_url, self.config.influxdb_org, self.config.influxdb_bucket)
+        if bucket_key in _verified_buckets:
+            return True
+        
         try:
             buckets_api = self.client.buckets_api()
             
-            # Check if bucket exists
-            buckets = buckets_api.find_buckets()
-            bucket_names = [bucket.name for bucket in buckets.buckets]
-            
-            if self.config.influxdb_bucket in bucket_names:
+            # Look the bucket up by name rather than listing every bucket
+            if buckets_api.find_bucket_by_name(self.config.influxdb_bucket) is not None:
                 self.logger.info(f"Bucket '{self.config.influxdb_bucket}' already exists")
+                _verified_buckets.add(bucket_key)
                 return True
             
             # Create bucket if it doesn't exist
@@ -180,10 +461,12 @@ class InfluxDBClient:
                     org_id=org.id
                 )
                 self.logger.info(f"Created bucket '{self.config.influxdb_bucket}'")
+                _verified_buckets.add(bucket_key)
                 return True
             except ApiException as e:
                 if "already exists" in str(e):
                     self.logger.info(f"Bucket '{self.config.influxdb_bucket}' already exists")
+                    _verified_buckets.add(bucket_key)
                     return True
                 else:
                     raise
@@ -192,15 +475,19 @@ class InfluxDBClient:
             self.logger.error(f"Error ensuring bucket exists: {e}")
             return False
     
-    async def write_metrics(self, metrics: Dict[str, Any]) -> bool:
+    async def write_metrics(self, metrics: Union[Dict[str, Any], List[Dict[str, Any]]]) -> bool:
         """
         Write metrics to InfluxDB.
         
+        Points are queued on the batching write API and flushed in the
+        background, so this returns as soon as the points are enqueued.
+        
         Args:
-            metrics: Processed metrics dictionary
+            metrics: Processed metrics dictionary, or a list of them to queue
+                in a single call
             
         Returns:
-            True if write succeeded, False otherwise.
+            True if the points were queued, False otherwise.
         """
         try:
             if not self.write_api:
@@ -208,19 +495,26 @@ class InfluxDBClient:
                 return False
             
             # Convert metrics to InfluxDB line protocol format
-            point_data = self._convert_to_point(metrics)
+            if isinstance(metrics, dict):
+                metrics = (metrics,)
+            elif not metrics:
+                return True
+            lines = [line for line in map(self._convert_to_point, metrics) if line]
             
-            if not point_data:
-                self.logger.error("Failed to convert metrics to InfluxDB point")
-                return False
+            if len(lines) < len(metrics):
+                self.logger.error(
+                    f"Failed to convert {len(metrics) - len(lines)} of {len(metrics)} metrics to InfluxDB points"
+                )
+                if not lines:
+                    return False
             
-            # Write to InfluxDB
+            # Queue for the next batch; flush errors surface via _on_write_error
             self.write_api.write(
                 bucket=self.config.influxdb_bucket,
-                record=point_data
+                record=lines
             )
             
-            self.logger.debug(f"Successfully wrote metrics to InfluxDB")
+            self.logger.debug("Queued %d points for InfluxDB batch write", len(lines))
             return True
             
         except Exception as e:
@@ -240,45 +534,36 @@ class InfluxDBClient:
         try:
             measurement = metrics.get('measurement', 'network_telemetry')
             
-            # Build tags
-            tags = []
-            for key, value in metrics.get('tags', {}).items():
-                if value is not None:
-                    tags.append(f"{key}={value}")
-            
-            tag_string = ','.join(tags)
-            if tag_string:
-                tag_string = ',' + tag_string
-            
-            # Build fields
-            fields = []
-            for key, value in metrics.get('fields', {}).items():
-                if value is not None:
-                    if isinstance(value, str):
-                        fields.append(f'{key}="{value}"')
-                    else:
-                        fields.append(f'{key}={value}')
+            # Build timestamp, preferring a precomputed nanosecond value
+            timestamp_ns = metrics.get('timestamp_ns')
+            if timestamp_ns is None:
+                timestamp = metrics.get('timestamp')
+                if timestamp is None:
+                    timestamp_ns = time.time_ns()
+                elif isinstance(timestamp, int):
+                    timestamp_ns = timestamp * 1_000_000_000  # Seconds to nanoseconds
+                else:
+                    timestamp_ns = int(timestamp * 1_000_000_000)
             
-            if not fields:
+            line = self._encoder.encode(
+                measurement, metrics.get('tags', {}), metrics.get('fields', {}), timestamp_ns
+            )
+            if line is None:
                 self.logger.warning("No fields to write")
                 return None
             
-            field_string = ','.join(fields)
-            
-            # Build timestamp
-            timestamp = metrics.get('timestamp', int(time.time()))
-            timestamp_ns = int(timestamp * 1_000_000_000)  # Convert to nanoseconds
-            
-            # Combine into line protocol format
-            line = f"{measurement}{tag_string} {field_string} {timestamp_ns}"
-            
-            self.logger.debug(f"Generated line protocol: {line}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Generated line protocol: %s", line)
             return line
             
         except Exception as e:
             self.logger.error(f"Error converting metrics to point: {e}")
             return None
     
+    def preload_field_keys(self, keys: Iterable[str]):
+        """Pre-escape the tag and field names of a fixed metrics schema."""
+        self._encoder.preload(keys)
+    
     async def query_metrics(self, query: str) -> Optional[List[Dict[str, Any]]]:
         """
         Query metrics from InfluxDB.
@@ -296,12 +581,8 @@ class InfluxDBClient:
             
             tables = self.query_api.query(query, org=self.config.influxdb_org)
             
-            results = []
-            for table in tables:
-                for record in table.records:
-                    results.append(record.values)
-            
-            return results
+            # Flatten in one comprehension rather than appending row by row
+            return [record.values for table in tables for record in table.records]
             
         except Exception as e:
             self.logger.error(f"Error querying InfluxDB: {e}")
@@ -317,21 +598,29 @@ class InfluxDBClient:
         Returns:
             List of recent metrics or None if query failed.
         """
-        query = f'''
-        from(bucket: "{self.config.influxdb_bucket}")
-        |> range(start: -{hours}h)
-        |> filter(fn: (r) => r._measurement == "network_telemetry")
-        |> sort(columns: ["_time"], desc: true)
-        |> limit(n: 100)
-        '''
+        # Dashboards poll the same window repeatedly; serve recent results from cache
+        now = time.monotonic()
+        cached = self._recent_metrics_cache.get(hours)
+        if cached is not None and now - cached[0] < _RECENT_METRICS_TTL:
+            return list(cached[1])
         
-        return await self.query_metrics(query)
+        results = await self.query_metrics(self._recent_metrics_query % hours)
+        if results is not None:
+            # Cache an immutable copy so callers can't change what others get
+            self._recent_metrics_cache[hours] = (now, tuple(results))
+        return results
     
     async def close(self):
         """Close InfluxDB connection."""
         try:
+            if self.write_api:
+                # Drain any queued points before the connection goes away
+                self.write_api.close()
+                self.write_api = None
             if self.client:
-                self.client.close()
+                _release_shared_client(self._client_key)
+                self.client = None
+                self._client_key = None
                 self.logger.info("InfluxDB client closed")
         except Exception as e:
             self.logger.error(f"Error closing InfluxDB client: {e}")
@@ -6,19 +6,32 @@ database connectivity, network reachability, and performance metrics.
 """
 
 import asyncio
+import random
 import time
 import json
 import socket
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import aiohttp
 import logging
 
+try:
+    import psutil
+except ImportError:  # Optional; the resource check reports UNKNOWN without it
+    psutil = None
+
 from .config import Config
 from .database import InfluxDBClient
 from .logging_config import ServiceHealthLogger
+from .scaling import ConnectionPool
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime (utcnow() is deprecated)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class HealthStatus(Enum):
@@ -29,7 +42,7 @@ class HealthStatus(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthCheckResult:
     """Result of a health check operation."""
     component: str
@@ -41,13 +54,17 @@ class HealthCheckResult:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary format."""
-        result = asdict(self)
-        result['status'] = self.status.value
-        result['timestamp'] = self.timestamp.isoformat()
-        return result
+        return {
+            'component': self.component,
+            'status': self.status.value,
+            'message': self.message,
+            'details': self.details,
+            'timestamp': self.timestamp.isoformat(),
+            'response_time_ms': self.response_time_ms
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceHealth:
     """Overall service health status."""
     status: HealthStatus
@@ -67,11 +84,16 @@ class ServiceHealth:
         }
 
 
+# Seconds a successful DNS lookup is trusted; matches the connector's ttl_dns_cache
+DNS_CACHE_TTL = 300
+
+
 class HealthChecker:
     """Comprehensive health check system for telemetry service."""
     
-    def __init__(self, config: Config):
-        """Initialize health checker."""
+    def __init__(self, config: Config, db_client: Optional[InfluxDBClient] = None,
+                 session: Optional[aiohttp.ClientSession] = None):
+        """Initialize health checker, optionally sharing a database client and HTTP session."""
         self.config = config
         self.logger = logging.getLogger('telemetry.health')
         self.health_logger = ServiceHealthLogger(self.logger)
@@ -82,21 +104,152 @@ class HealthChecker:
         self.max_response_time_ms = 5000
         self.max_database_response_time_ms = 2000
         self.max_network_response_time_ms = 10000
+        self.max_collection_time_ms = 30000  # A full ping + traceroute sample
+        
+        # Targets probed by the network check when none are given
+        raw_targets = getattr(self.config, 'target_fqdn', '') or 'google.com'
+        self._default_targets: Tuple[str, ...] = tuple(
+            target.strip() for target in raw_targets.split(',') if target.strip()
+        )
+        
+        # Probe result cache: name -> (monotonic expiry, result). Failures
+        # expire sooner so a recovered service is reported promptly.
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_ttl = {'quick': 5.0, 'full': 30.0, 'fail': 3.0}
+        self._cache_locks = {'quick': asyncio.Lock(), 'full': asyncio.Lock()}
+        
+        # Periodic refresh task started by start_background()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._latest: Optional[ServiceHealth] = None
+        
+        # In-flight component checks; concurrent callers share one run
+        self._inflight: Dict[Any, asyncio.Task] = {}
+        
+        # Database client reused across checks; dropped after a failure so
+        # the next check reconnects
+        self._db = db_client
+        self._owns_db = False
+        self._db_lock = asyncio.Lock()
+        
+        # Collector reused by the telemetry collection check
+        self._telemetry = None
+        self._telemetry_lock = asyncio.Lock()
+        
+        # HTTP session for network checks; defaults to the process-wide pool
+        self._session = session
+        
+        # Hosts that resolved recently: host -> monotonic expiry
+        self._resolved: Dict[str, float] = {}
+        
+        # Disk usage barely moves between checks: (monotonic expiry, usage)
+        self._disk_usage: Optional[Tuple[float, Any]] = None
+        
+        # Prime psutil's CPU counters so later non-blocking reads have a baseline
+        if psutil is not None:
+            psutil.cpu_percent(interval=None)
         
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the injected HTTP session, or the shared pool's session."""
+        if self._session is not None:
+            return self._session
+        return await ConnectionPool.instance().get_session()
+    
+    async def _get_db(self) -> InfluxDBClient:
+        """Return the shared database client, connecting on first use."""
+        async with self._db_lock:
+            if self._db is None:
+                db_client = InfluxDBClient(self.config)
+                if not await db_client.initialize():
+                    await db_client.close()
+                    raise ConnectionError("Failed to initialize InfluxDB client")
+                self._db = db_client
+                self._owns_db = True
+            return self._db
+    
+    async def _invalidate_db(self, db_client: Optional[InfluxDBClient]):
+        """Forget a client that failed so the next check reconnects."""
+        if db_client is None or self._db is not db_client:
+            return
+        self._db = None
+        if self._owns_db:
+            await db_client.close()
+    
+    async def _ping_db(self):
+        """Ping InfluxDB through the shared client; raises and drops the client on failure."""
+        db_client = await self._get_db()
+        try:
+            if not await db_client.ping(force=True):
+                raise ConnectionError("InfluxDB ping failed")
+        except Exception:
+            await self._invalidate_db(db_client)
+            raise
+    
+    async def _get_telemetry(self):
+        """Return the shared NetworkTelemetry collector, creating it on first use."""
+        async with self._telemetry_lock:
+            if self._telemetry is None:
+                # Import here to avoid circular imports
+                from .telemetry import NetworkTelemetry
+                self._telemetry = NetworkTelemetry(self.config, session=self._session)
+            return self._telemetry
+    
+    async def _resolve(self, host: str):
+        """Resolve ``host`` without blocking the event loop; raises on failure."""
+        if self._resolved.get(host, 0) > time.monotonic():
+            return
+        await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        self._resolved[host] = time.monotonic() + DNS_CACHE_TTL
+    
+    async def close(self):
+        """Stop background refreshes and release the database client and collector."""
+        await self.stop()
+        if self._db is not None and self._owns_db:
+            await self._db.close()
+        self._db = None
+        if self._telemetry is not None:
+            await self._telemetry.cleanup()
+            self._telemetry = None
+    
+    async def _single_flight(self, key: Any, check) -> HealthCheckResult:
+        """Run ``check()`` unless an identical check is already running, then share its result."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(check())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled caller doesn't cancel the check for the others
+        return await asyncio.shield(task)
+    
+    def _get_cached(self, name: str) -> Optional[Any]:
+        """Return the cached result for ``name`` if it has not expired."""
+        entry = self._cache.get(name)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+    
+    def _store_cached(self, name: str, result: Any, healthy: bool) -> float:
+        """Cache a result and return the TTL applied to it."""
+        ttl = self._cache_ttl[name if healthy else 'fail']
+        self._cache[name] = (time.monotonic() + ttl, result)
+        return ttl
+    
     async def check_database_health(self) -> HealthCheckResult:
         """Check InfluxDB database connectivity and performance."""
+        return await self._single_flight('database', self._check_database_health)
+    
+    async def _check_database_health(self) -> HealthCheckResult:
+        """Run the database check (see check_database_health)."""
         start_time = time.time()
+        db_client = None
         
         try:
-            # Create database client
-            db_client = InfluxDBClient(self.config)
-            
-            # Test connection
-            await db_client.initialize()
+            # Reuse the shared, already connected client
+            db_client = await self._get_db()
             
             # Test basic query
             test_query = 'buckets() |> filter(fn:(r) => r.name == "default") |> limit(1)'
-            await db_client.query(test_query)
+            if await db_client.query_metrics(test_query) is None:
+                raise ConnectionError("Test query failed")
             
             response_time = (time.time() - start_time) * 1000
             
@@ -117,6 +270,7 @@ class HealthChecker:
             self.health_logger.log_database_connection('influxdb', 'connected', details)
             
         except Exception as e:
+            await self._invalidate_db(db_client)
             response_time = (time.time() - start_time) * 1000
             status = HealthStatus.UNHEALTHY
             message = f"Database connection failed: {str(e)}"
@@ -133,53 +287,36 @@ class HealthChecker:
             status=status,
             message=message,
             details=details,
-            timestamp=datetime.utcnow(),
+            timestamp=_utcnow(),
             response_time_ms=round(response_time, 2)
         )
     
     async def check_network_connectivity(self, targets: Optional[List[str]] = None) -> HealthCheckResult:
         """Check network connectivity to monitoring targets."""
+        targets = tuple(target.strip() for target in targets) if targets else self._default_targets
+        return await self._single_flight(('network', targets), lambda: self._check_network_connectivity(targets))
+    
+    async def _check_network_connectivity(self, targets: Tuple[str, ...]) -> HealthCheckResult:
+        """Run the network check (see check_network_connectivity)."""
         start_time = time.time()
         
-        if not targets:
-            targets = self.config.target_fqdn.split(',') if hasattr(self.config, 'target_fqdn') else ['google.com']
-        
         successful_targets = []
         failed_targets = []
         
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                for target in targets:
-                    target = target.strip()
-                    try:
-                        # Test HTTP connectivity
-                        async with session.get(f'http://{target}', timeout=5) as response:
-                            if response.status < 500:
-                                successful_targets.append({
-                                    'target': target,
-                                    'status_code': response.status,
-                                    'reachable': True
-                                })
-                            else:
-                                failed_targets.append({
-                                    'target': target,
-                                    'status_code': response.status,
-                                    'error': f'HTTP {response.status}'
-                                })
-                    except Exception as e:
-                        # Try DNS resolution as fallback
-                        try:
-                            socket.gethostbyname(target)
-                            successful_targets.append({
-                                'target': target,
-                                'dns_resolvable': True,
-                                'http_reachable': False
-                            })
-                        except Exception:
-                            failed_targets.append({
-                                'target': target,
-                                'error': str(e)
-                            })
+            # Probe every target concurrently so the check takes as long as the slowest one
+            session = await self._get_session()
+            results = await asyncio.gather(
+                *[self._probe_target(session, target) for target in targets],
+                return_exceptions=True
+            )
+            for target, result in zip(targets, results):
+                if isinstance(result, Exception):
+                    failed_targets.append({'target': target, 'error': str(result)})
+                elif result.pop('ok'):
+                    successful_targets.append(result)
+                else:
+                    failed_targets.append(result)
             
             response_time = (time.time() - start_time) * 1000
             
@@ -217,56 +354,109 @@ class HealthChecker:
             status=status,
             message=message,
             details=details,
-            timestamp=datetime.utcnow(),
+            timestamp=_utcnow(),
             response_time_ms=round(response_time, 2)
         )
     
-    async def check_system_resources(self) -> HealthCheckResult:
-        """Check system resource usage."""
-        start_time = time.time()
-        
+    async def _probe_target(self, session: aiohttp.ClientSession, target: str) -> Dict[str, Any]:
+        """Probe one target over HTTP, falling back to DNS resolution; ``ok`` marks success."""
         try:
-            import psutil
+            # Test HTTP connectivity; HEAD avoids downloading the page body
+            async with session.head(f'http://{target}', timeout=5, allow_redirects=False) as response:
+                status_code = response.status
             
-            # Get system metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            if status_code in (405, 501):
+                # HEAD not supported; a TCP connection still proves the path
+                await self._tcp_probe(target, 80)
             
-            # Determine status based on thresholds
-            issues = []
-            if cpu_percent > 80:
-                issues.append(f"High CPU usage: {cpu_percent}%")
-            if memory.percent > 80:
-                issues.append(f"High memory usage: {memory.percent}%")
-            if disk.percent > 90:
-                issues.append(f"High disk usage: {disk.percent}%")
-            
-            if issues:
-                status = HealthStatus.DEGRADED if len(issues) <= 2 else HealthStatus.UNHEALTHY
-                message = f"Resource issues: {', '.join(issues)}"
-            else:
-                status = HealthStatus.HEALTHY
-                message = "System resources normal"
-            
-            details = {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'memory_available_gb': round(memory.available / (1024**3), 2),
-                'disk_percent': disk.percent,
-                'disk_free_gb': round(disk.free / (1024**3), 2),
-                'issues': issues
+            if status_code < 500 or status_code == 501:
+                return {
+                    'ok': True,
+                    'target': target,
+                    'status_code': status_code,
+                    'reachable': True
+                }
+            return {
+                'ok': False,
+                'target': target,
+                'status_code': status_code,
+                'error': f'HTTP {status_code}'
             }
-            
-        except ImportError:
+        except Exception as e:
+            # Try DNS resolution as fallback
+            try:
+                await self._resolve(target)
+                return {
+                    'ok': True,
+                    'target': target,
+                    'dns_resolvable': True,
+                    'http_reachable': False
+                }
+            except Exception:
+                return {
+                    'ok': False,
+                    'target': target,
+                    'error': str(e)
+                }
+    
+    async def _tcp_probe(self, host: str, port: int, timeout: float = 5.0):
+        """Open and immediately close a TCP connection; raises if unreachable."""
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.close()
+        await writer.wait_closed()
+    
+    async def check_system_resources(self) -> HealthCheckResult:
+        """Check system resource usage."""
+        return await self._single_flight('system_resources', self._check_system_resources)
+    
+    async def _check_system_resources(self) -> HealthCheckResult:
+        """Run the resource check (see check_system_resources)."""
+        start_time = time.time()
+        
+        if psutil is None:
             # psutil not available, basic check
             status = HealthStatus.UNKNOWN
             message = "System resource monitoring not available (psutil not installed)"
             details = {'error': 'psutil module not available'}
-        except Exception as e:
-            status = HealthStatus.UNKNOWN
-            message = f"System resource check failed: {str(e)}"
-            details = {'error': str(e)}
+        else:
+            try:
+                # Get system metrics; CPU usage is measured since the previous call
+                # instead of sampling for a second
+                cpu_percent = psutil.cpu_percent(interval=None)
+                memory = await asyncio.to_thread(psutil.virtual_memory)
+                if self._disk_usage is None or time.monotonic() >= self._disk_usage[0]:
+                    self._disk_usage = (time.monotonic() + 10.0, await asyncio.to_thread(psutil.disk_usage, '/'))
+                disk = self._disk_usage[1]
+                
+                # Determine status based on thresholds
+                issues = []
+                if cpu_percent > 80:
+                    issues.append(f"High CPU usage: {cpu_percent}%")
+                if memory.percent > 80:
+                    issues.append(f"High memory usage: {memory.percent}%")
+                if disk.percent > 90:
+                    issues.append(f"High disk usage: {disk.percent}%")
+                
+                if issues:
+                    status = HealthStatus.DEGRADED if len(issues) <= 2 else HealthStatus.UNHEALTHY
+                    message = f"Resource issues: {', '.join(issues)}"
+                else:
+                    status = HealthStatus.HEALTHY
+                    message = "System resources normal"
+                
+                details = {
+                    'cpu_percent': cpu_percent,
+                    'memory_percent': memory.percent,
+                    'memory_available_gb': round(memory.available / (1024**3), 2),
+                    'disk_percent': disk.percent,
+                    'disk_free_gb': round(disk.free / (1024**3), 2),
+                    'issues': issues
+                }
+            
+            except Exception as e:
+                status = HealthStatus.UNKNOWN
+                message = f"System resource check failed: {str(e)}"
+                details = {'error': str(e)}
         
         response_time = (time.time() - start_time) * 1000
         
@@ -275,20 +465,20 @@ class HealthChecker:
             status=status,
             message=message,
             details=details,
-            timestamp=datetime.utcnow(),
+            timestamp=_utcnow(),
             response_time_ms=round(response_time, 2)
         )
     
     async def check_telemetry_collection(self) -> HealthCheckResult:
         """Check if telemetry collection is working properly."""
+        return await self._single_flight('telemetry_collection', self._check_telemetry_collection)
+    
+    async def _check_telemetry_collection(self) -> HealthCheckResult:
+        """Run the collection check (see check_telemetry_collection)."""
         start_time = time.time()
         
         try:
-            # Import here to avoid circular imports
-            from .telemetry import NetworkTelemetry
-            
-            # Create telemetry instance
-            telemetry = NetworkTelemetry(self.config)
+            telemetry = await self._get_telemetry()
             
             # Test single collection
             test_target = 'google.com'
@@ -328,26 +518,97 @@ class HealthChecker:
             status=status,
             message=message,
             details=details,
-            timestamp=datetime.utcnow(),
+            timestamp=_utcnow(),
             response_time_ms=round(response_time, 2)
         )
     
     async def perform_comprehensive_health_check(self) -> ServiceHealth:
+        """Perform all health checks, reusing a recent result if still fresh."""
+        # Concurrent callers wait for the one in-flight check and share its result
+        async with self._cache_locks['full']:
+            service_health = self._get_cached('full')
+            if service_health is None:
+                service_health = await self._refresh_comprehensive_health_check()
+            return service_health
+    
+    async def _refresh_comprehensive_health_check(self) -> ServiceHealth:
+        """Run all health checks and cache the result; caller holds the 'full' lock."""
+        service_health = await self._perform_comprehensive_health_check()
+        self._store_cached('full', service_health, service_health.status != HealthStatus.UNHEALTHY)
+        self._latest = service_health
+        return service_health
+    
+    def latest(self) -> Optional[ServiceHealth]:
+        """Return the most recent comprehensive result without running any checks."""
+        return self._latest
+    
+    def start_background(self, interval: float = 20.0):
+        """
+        Refresh the comprehensive health check periodically in the background.
+        
+        Probes can then be answered from latest() or the cache without paying
+        for a full check. The first run is delayed by a random fraction of
+        ``interval`` so replicas don't all hit InfluxDB at once.
+        
+        Args:
+            interval: Seconds between refreshes
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop(interval))
+    
+    async def stop(self):
+        """Stop the background refresh task."""
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    async def _refresh_loop(self, interval: float):
+        """Refresh the comprehensive result every ``interval`` seconds until cancelled."""
+        await asyncio.sleep(random.uniform(0, interval))
+        while True:
+            try:
+                async with self._cache_locks['full']:
+                    await self._refresh_comprehensive_health_check()
+            except Exception as e:
+                self.logger.error(f"Background health check failed: {e}")
+            await asyncio.sleep(interval)
+    
+    async def _with_timeout(self, check, timeout_ms: float, component: str) -> HealthCheckResult:
+        """Await a component check, reporting it as degraded if it exceeds ``timeout_ms``."""
+        try:
+            return await asyncio.wait_for(check, timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return HealthCheckResult(
+                component=component,
+                status=HealthStatus.DEGRADED,
+                message=f"Check timed out after {timeout_ms / 1000:g}s",
+                details={'timeout_ms': timeout_ms},
+                timestamp=_utcnow(),
+                response_time_ms=timeout_ms
+            )
+    
+    async def _perform_comprehensive_health_check(self) -> ServiceHealth:
         """Perform all health checks and return overall status."""
         start_time = time.time()
         
         self.logger.info("Starting comprehensive health check")
         
-        # Run all health checks concurrently
+        # Run all health checks concurrently, each bounded so one hung
+        # dependency can't stall the whole probe
         health_checks = await asyncio.gather(
-            self.check_database_health(),
-            self.check_network_connectivity(),
-            self.check_system_resources(),
-            self.check_telemetry_collection(),
+            self._with_timeout(self.check_database_health(), self.max_response_time_ms, "database"),
+            self._with_timeout(self.check_network_connectivity(), self.max_network_response_time_ms, "network"),
+            self._with_timeout(self.check_system_resources(), self.max_response_time_ms, "system_resources"),
+            self._with_timeout(self.check_telemetry_collection(), self.max_collection_time_ms, "telemetry_collection"),
             return_exceptions=True
         )
         
-        # Process results
+        # Process results; results synthesized here share one timestamp
+        now = _utcnow()
         components = []
         for check in health_checks:
             if isinstance(check, Exception):
@@ -356,20 +617,21 @@ class HealthChecker:
                     status=HealthStatus.UNHEALTHY,
                     message=f"Health check failed: {str(check)}",
                     details={'error': str(check)},
-                    timestamp=datetime.utcnow(),
+                    timestamp=now,
                     response_time_ms=0
                 ))
             else:
                 components.append(check)
         
-        # Determine overall status
-        statuses = [comp.status for comp in components]
+        # Determine overall status from a single tally of component statuses
+        counts = Counter(comp.status for comp in components)
+        healthy_count = counts[HealthStatus.HEALTHY]
         
-        if all(status == HealthStatus.HEALTHY for status in statuses):
+        if healthy_count == len(components):
             overall_status = HealthStatus.HEALTHY
-        elif any(status == HealthStatus.UNHEALTHY for status in statuses):
+        elif counts[HealthStatus.UNHEALTHY]:
             overall_status = HealthStatus.UNHEALTHY
-        elif any(status == HealthStatus.DEGRADED for status in statuses):
+        elif counts[HealthStatus.DEGRADED]:
             overall_status = HealthStatus.DEGRADED
         else:
             overall_status = HealthStatus.UNKNOWN
@@ -381,7 +643,7 @@ class HealthChecker:
             components=components,
             uptime_seconds=uptime,
             version=self.version,
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
         
         # Log overall result
@@ -390,7 +652,7 @@ class HealthChecker:
             overall_status.value,
             {
                 'total_components': len(components),
-                'healthy_components': len([c for c in components if c.status == HealthStatus.HEALTHY]),
+                'healthy_components': healthy_count,
                 'total_check_time_ms': round(total_time, 2),
                 'uptime_seconds': uptime
             }
@@ -399,22 +661,37 @@ class HealthChecker:
         return service_health
     
     async def quick_health_check(self) -> Dict[str, Any]:
+        """Perform a quick health check for liveness probes, reusing a recent result if still fresh."""
+        async with self._cache_locks['quick']:
+            result = self._get_cached('quick')
+            if result is None:
+                result = await self._quick_health_check()
+                cached_at = _utcnow()
+                ttl = self._store_cached('quick', result, result['status'] == 'healthy')
+                result['cached_at'] = cached_at.isoformat()
+                result['expires_at'] = (cached_at + timedelta(seconds=ttl)).isoformat()
+            return dict(result)
+    
+    async def _quick_health_check(self) -> Dict[str, Any]:
         """Perform a quick health check for liveness probes."""
         start_time = time.time()
         
         try:
-            # Quick database ping
-            db_client = InfluxDBClient(self.config)
-            await db_client.initialize()
-            
-            # Quick network test
-            socket.gethostbyname('google.com')
+            # Database and network checks are independent, so run them together;
+            # the database connects only if there is no shared client yet
+            for result in await asyncio.gather(
+                self._ping_db(),
+                self._resolve('google.com'),
+                return_exceptions=True
+            ):
+                if isinstance(result, Exception):
+                    raise result
             
             response_time = (time.time() - start_time) * 1000
             
             return {
                 'status': 'healthy',
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': _utcnow().isoformat(),
                 'response_time_ms': round(response_time, 2),
                 'uptime_seconds': time.time() - self.start_time
             }
@@ -424,7 +701,7 @@ class HealthChecker:
             
             return {
                 'status': 'unhealthy',
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': _utcnow().isoformat(),
                 'response_time_ms': round(response_time, 2),
                 'uptime_seconds': time.time() - self.start_time,
                 'error': str(e)
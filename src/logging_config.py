@@ -5,14 +5,53 @@ Provides centralized logging setup with multiple output formats,
 log levels, and structured JSON logging for production environments.
 """
 
+import atexit
 import logging
 import logging.config
+import logging.handlers
+import queue
 import sys
 import json
-from datetime import datetime
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
 import os
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED_ATTRS = frozenset({
+    'name', 'msg', 'args', 'levelname', 'levelno',
+    'pathname', 'filename', 'module', 'lineno',
+    'funcName', 'created', 'msecs', 'relativeCreated',
+    'thread', 'threadName', 'processName', 'process', 'taskName',
+    'getMessage', 'exc_info', 'exc_text', 'stack_info', 'message', 'asctime',
+})
+
+# Process id, refreshed in forked children
+_PID = os.getpid()
+
+
+def _refresh_pid():
+    """Update the cached process id after a fork."""
+    global _PID
+    _PID = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_refresh_pid)
+
+
+if orjson is not None:
+    def _dumps(obj: Dict[str, Any]) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+else:
+    def _dumps(obj: Dict[str, Any]) -> str:
+        return json.dumps(obj, separators=(',', ':'), default=str)
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
@@ -20,14 +59,14 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_entry = {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat() + 'Z',
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
             'module': record.module,
             'function': record.funcName,
             'line': record.lineno,
-            'process_id': os.getpid(),
+            'process_id': _PID,
             'thread_id': record.thread,
         }
         
@@ -37,19 +76,61 @@ class JSONFormatter(logging.Formatter):
         
         # Add custom fields from extra
         for key, value in record.__dict__.items():
-            if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 
-                          'pathname', 'filename', 'module', 'lineno', 
-                          'funcName', 'created', 'msecs', 'relativeCreated',
-                          'thread', 'threadName', 'processName', 'process',
-                          'getMessage', 'exc_info', 'exc_text', 'stack_info']:
+            if key not in _RESERVED_ATTRS:
                 log_entry[key] = value
         
-        return json.dumps(log_entry, separators=(',', ':'))
+        return _dumps(log_entry)
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for an in-process queue that leaves exc_info for the formatter."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge args into the message now; formatting happens on the listener thread."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def start_queue_logging(logger: logging.Logger, *handlers: logging.Handler,
+                        respect_handler_level: bool = False) -> logging.handlers.QueueListener:
+    """Send logger's records through a queue to handlers on a background thread; returns the started listener."""
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_LocalQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=respect_handler_level)
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(logger: logging.Logger, listener: logging.handlers.QueueListener):
+    """Flush and stop a listener from start_queue_logging, detach its queue handler and close its handlers."""
+    listener.stop()
+    for handler in list(logger.handlers):
+        if isinstance(handler, _LocalQueueHandler) and handler.queue is listener.queue:
+            logger.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
+
+
+# Rotation limits for log files written by TelemetryLogger.setup_logging
+LOG_FILE_MAX_BYTES = 50 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
 
 
 class TelemetryLogger:
     """Enhanced logging setup for telemetry service."""
     
+    # Background listener that owns the real handlers (see setup_logging)
+    _listener: Optional[logging.handlers.QueueListener] = None
+    
+    @staticmethod
+    def stop_logging():
+        """Flush queued records and stop the background log listener."""
+        listener = TelemetryLogger._listener
+        if listener is not None:
+            TelemetryLogger._listener = None
+            stop_queue_logging(logging.getLogger(), listener)
+    
     @staticmethod
     def setup_logging(
         log_level: str = "INFO",
@@ -60,6 +141,11 @@ class TelemetryLogger:
         """
         Set up comprehensive logging for the telemetry service.
         
+        Records are queued by the root logger's QueueHandler and written by a
+        background QueueListener thread, so logging calls never block on
+        stdout or disk. Call stop_logging() to flush on shutdown (it is also
+        registered with atexit).
+        
         Args:
             log_level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             log_format: Format type (console, detailed, json)
@@ -90,7 +176,9 @@ class TelemetryLogger:
         root_logger.setLevel(getattr(logging, log_level.upper()))
         
         # Clear existing handlers
+        TelemetryLogger.stop_logging()
         root_logger.handlers.clear()
+        handlers = []
         
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
@@ -101,14 +189,18 @@ class TelemetryLogger:
         else:
             console_handler.setFormatter(console_formatter)
         
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
         
         # File handler (if specified)
         if log_file:
             # Ensure log directory exists
             os.makedirs(os.path.dirname(log_file), exist_ok=True)
             
-            file_handler = logging.FileHandler(log_file)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT
+            )
             file_handler.setLevel(getattr(logging, log_level.upper()))
             
             if enable_json:
@@ -120,7 +212,10 @@ class TelemetryLogger:
                 )
                 file_handler.setFormatter(detailed_formatter)
             
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
+        
+        # Hand records to a background thread that formats and writes them
+        TelemetryLogger._listener = start_queue_logging(root_logger, *handlers, respect_handler_level=True)
         
         # Create telemetry-specific logger
         telemetry_logger = logging.getLogger('telemetry')
@@ -187,50 +282,59 @@ class ServiceHealthLogger:
     
     def log_service_start(self, service_name: str, config: Dict[str, Any]):
         """Log service startup."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         startup_data = {
             'service_name': service_name,
             'config': config,
             'event_type': 'service_start'
         }
-        self.logger.info(f"Service starting: {service_name}", extra=startup_data)
+        self.logger.info("Service starting: %s", service_name, extra=startup_data)
     
     def log_service_stop(self, service_name: str, reason: str = "normal"):
         """Log service shutdown."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         shutdown_data = {
             'service_name': service_name,
             'shutdown_reason': reason,
             'event_type': 'service_stop'
         }
-        self.logger.info(f"Service stopping: {service_name}", extra=shutdown_data)
+        self.logger.info("Service stopping: %s", service_name, extra=shutdown_data)
     
     def log_health_check(self, status: str, details: Dict[str, Any]):
         """Log health check results."""
+        level = logging.INFO if status == 'healthy' else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
         health_data = {
             'health_status': status,
             'health_details': details,
             'event_type': 'health_check'
         }
         
-        if status == 'healthy':
+        if level == logging.INFO:
             self.logger.info("Service health check passed", extra=health_data)
         else:
             self.logger.error("Service health check failed", extra=health_data)
     
     def log_database_connection(self, database: str, status: str, details: Optional[Dict] = None):
         """Log database connection status."""
+        level = logging.INFO if status == 'connected' else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
+        # Built in one step; entries in details override the base keys
         db_data = {
             'database': database,
             'connection_status': status,
-            'event_type': 'database_connection'
+            'event_type': 'database_connection',
+            **(details or {})
         }
         
-        if details:
-            db_data.update(details)
-        
-        if status == 'connected':
-            self.logger.info(f"Database connection established: {database}", extra=db_data)
+        if level == logging.INFO:
+            self.logger.info("Database connection established: %s", database, extra=db_data)
         else:
-            self.logger.error(f"Database connection failed: {database}", extra=db_data)
+            self.logger.error("Database connection failed: %s", database, extra=db_data)
 
 
 # Default logging configuration
@@ -289,6 +393,9 @@ DEFAULT_LOGGING_CONFIG = {
 }
 
 
+atexit.register(TelemetryLogger.stop_logging)
+
+
 def setup_production_logging():
     """Set up production-ready logging configuration."""
     return TelemetryLogger.setup_logging(
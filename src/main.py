@@ -6,52 +6,79 @@ Simplified main service using the consolidated telemetry module.
 
 import asyncio
 import logging
+import logging.handlers
 import os
 import signal
 import sys
 from typing import Optional
 
-from .config import Config
+try:
+    import uvloop  # Optional faster event loop
+except ImportError:
+    uvloop = None
+
+from .config import get_config
+from .logging_config import start_queue_logging, stop_queue_logging
 from .telemetry import NetworkTelemetry
 
+# Skip LogRecord fields nothing here reports (JSON logs use a cached pid);
+# thread ids stay on because JSONFormatter emits them
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 
 class NetworkTelemetryService:
     """Main service orchestrator for network telemetry collection."""
     
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
         self.logger = self._setup_logging()
         self.telemetry: Optional[NetworkTelemetry] = None
         self.running = False
+        self._initialized = False
+        self._stop_event = asyncio.Event()
         
     def _setup_logging(self) -> logging.Logger:
         """Configure logging for the service."""
         logger = logging.getLogger(__name__)
         logger.setLevel(getattr(logging, self.config.log_level))
         
-        # Create formatters
+        # Create formatters; a fixed datefmt skips the default millisecond suffix
         formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%dT%H:%M:%S'
         )
         
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers = [console_handler]
         
         # File handler
+        file_error = None
         try:
             os.makedirs('logs', exist_ok=True)
             file_handler = logging.FileHandler('logs/network_telemetry.log')
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
         except Exception as e:
-            logger.warning(f"Could not create file handler: {e}")
+            file_error = e
+        
+        # Format and write on a background thread so the event loop never
+        # blocks on stdout or disk
+        self._log_listener = start_queue_logging(logger, *handlers)
+        
+        if file_error is not None:
+            logger.warning(f"Could not create file handler: {file_error}")
         
         return logger
     
     async def initialize(self) -> bool:
-        """Initialize all service components."""
+        """Initialize all service components; later calls return True once this has succeeded."""
+        if self._initialized and self.telemetry is not None:
+            return True
+        
         try:
             self.logger.info("Starting Network Telemetry Service initialization...")
             
@@ -67,6 +94,7 @@ class NetworkTelemetryService:
                 return False
             
             self.logger.info("Service initialization completed successfully")
+            self._initialized = True
             return True
             
         except Exception as e:
@@ -85,23 +113,43 @@ class NetworkTelemetryService:
             self.logger.error(f"Error in monitoring cycle: {e}")
     
     async def run(self):
-        """Main service loop."""
+        """Main service loop; raises RuntimeError if the service cannot be initialized."""
         self.running = True
         self.logger.info("Network Telemetry Service started")
         
         # Initialize service first
         if not await self.initialize():
             self.logger.error("Failed to initialize service, exiting")
-            return
+            raise RuntimeError("Failed to initialize service")
+        
+        # Fixed-rate schedule: cycles start every interval regardless of how
+        # long each one takes, instead of drifting by the cycle duration
+        loop = asyncio.get_running_loop()
+        interval = self.config.monitoring_interval
+        deadline = loop.time() + interval
         
         while self.running:
             try:
                 await self.run_monitoring_cycle()
-                await asyncio.sleep(self.config.monitoring_interval)
+                
+                now = loop.time()
+                if deadline < now:
+                    self.logger.warning(f"Monitoring cycle overran the {interval}s interval, skipping ahead")
+                    deadline = now + interval
+                await self._wait_for_stop(deadline - now)
+                deadline += interval
                 
             except Exception as e:
                 self.logger.error(f"Error in main loop: {e}")
-                await asyncio.sleep(10)  # Wait before retrying
+                await self._wait_for_stop(10)  # Wait before retrying
+                deadline = loop.time() + interval
+    
+    async def _wait_for_stop(self, timeout: float):
+        """Sleep for up to ``timeout`` seconds, returning early once stop() is called."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
     
     async def cleanup(self):
         """Cleanup resources."""
@@ -111,38 +159,31 @@ class NetworkTelemetryService:
             self.logger.info("Service cleanup completed")
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
+        finally:
+            if self._log_listener is not None:
+                stop_queue_logging(self.logger, self._log_listener)
+                self._log_listener = None
     
     def stop(self):
-        """Stop the service gracefully."""
+        """Stop the service gracefully; must be called from the event loop thread."""
         self.running = False
+        self._stop_event.set()
         self.logger.info("Service stop requested")
 
 
-# Global service instance for signal handling
-service_instance = None
-
-
-def signal_handler(signum, frame):
-    """Handle shutdown signals."""
-    global service_instance
-    if service_instance:
-        service_instance.stop()
-
-
 async def main():
     """Main function."""
-    global service_instance
-    
-    # Set up signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     service_instance = NetworkTelemetryService()
     
+    # Handle shutdown signals on the event loop rather than in signal context
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, service_instance.stop)
+        except NotImplementedError:  # e.g. Windows event loops
+            signal.signal(signum, lambda *_: loop.call_soon_threadsafe(service_instance.stop))
+    
     try:
-        if not await service_instance.initialize():
-            sys.exit(1)
-        
         await service_instance.run()
         
     except Exception as e:
@@ -153,5 +194,16 @@ async def main():
         await service_instance.cleanup()
 
 
+def run():
+    """Run main() on uvloop when it is installed, else on the default loop."""
+    if uvloop is None:
+        asyncio.run(main())
+    elif sys.version_info >= (3, 12):
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+    else:
+        uvloop.install()
+        asyncio.run(main())
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -7,6 +7,8 @@ and horizontal scaling utilities for high-availability deployments.
 
 import asyncio
 import aiohttp
+import concurrent.futures
+import os
 import time
 import logging
 from datetime import datetime, timedelta
@@ -15,13 +17,43 @@ from dataclasses import dataclass, field
 from enum import Enum
 import random
 import json
+import sys
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 import weakref
 
+try:
+    import aiodns  # Lets aiohttp resolve names without the thread pool
+except ImportError:
+    aiodns = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 from .config import Config
 from .logging_config import TelemetryLogger
 
 
+if orjson is not None:
+    def _dumps(obj: Dict[str, Any]) -> bytes:
+        return orjson.dumps(obj)
+else:
+    def _dumps(obj: Dict[str, Any]) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+
+# Clock for circuit breaker timing; unaffected by wall-clock adjustments
+_mono = time.monotonic
+
+# Shared by every CircuitBreaker; the breaker name goes in the message and extra
+_CB_LOGGER = logging.getLogger('telemetry.circuit_breaker')
+
+# Circuit breakers kept by ScalingManager before the least recently used is dropped
+_CB_CACHE_MAX = 10_000
+
+
 class CircuitState(Enum):
     """Circuit breaker states."""
     CLOSED = "closed"       # Normal operation
@@ -35,7 +67,7 @@ class CircuitBreakerConfig:
     failure_threshold: int = 5          # Failures before opening
     recovery_timeout: int = 60          # Seconds before trying half-open
     success_threshold: int = 3          # Successes to close from half-open
-    timeout: float = 10.0              # Request timeout in seconds
+    timeout: Optional[float] = 10.0    # Request timeout in seconds (None/0 to rely on the callee's own)
 
 
 @dataclass
@@ -43,9 +75,10 @@ class ConnectionPoolConfig:
     """Configuration for connection pooling."""
     max_connections: int = 100          # Max connections per pool
     max_connections_per_host: int = 30  # Max per host
-    keepalive_timeout: int = 30         # Keep connections alive
+    keepalive_timeout: int = 60         # Keep idle connections for reuse
     connection_timeout: float = 10.0    # Connection timeout
     read_timeout: float = 30.0         # Read timeout
+    dns_cache_ttl: int = 300           # Seconds to cache DNS lookups
 
 
 @dataclass
@@ -59,7 +92,14 @@ class ConcurrencyConfig:
 
 
 class CircuitBreaker:
-    """Circuit breaker implementation for fault tolerance."""
+    """
+    Circuit breaker implementation for fault tolerance.
+    
+    State transitions (_admit, _on_success, _on_failure) are synchronous, so
+    each one runs to completion on the event loop without interleaving and
+    needs no lock: N concurrent failures trip the breaker at exactly
+    failure_threshold.
+    """
     
     def __init__(self, name: str, config: CircuitBreakerConfig = None):
         """Initialize circuit breaker."""
@@ -69,16 +109,29 @@ class CircuitBreaker:
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time = None
-        self.logger = logging.getLogger(f'telemetry.circuit_breaker.{name}')
+        self.logger = _CB_LOGGER
+        self._log_extra = {'circuit_breaker': name}
+        
+        # Pick the call path once; without a timeout, skip wait_for's extra task and timer
+        self.call = self._call_with_timeout if self.config.timeout else self._call_no_timeout
     
-    async def call(self, func: Callable, *args, **kwargs):
-        """Execute function with circuit breaker protection."""
-        if self.state == CircuitState.OPEN:
-            if self._should_attempt_reset():
+    def _admit(self):
+        """Raise if the breaker is open; move to half-open once recovery is due."""
+        if self.state is CircuitState.OPEN:
+            # Only reachable after a failure, so last_failure_time is set
+            if _mono() - self.last_failure_time >= self.config.recovery_timeout:
                 self.state = CircuitState.HALF_OPEN
-                self.logger.info(f"Circuit breaker {self.name} attempting recovery")
+                self.logger.info("Circuit breaker %s attempting recovery", self.name, extra=self._log_extra)
             else:
                 raise Exception(f"Circuit breaker {self.name} is OPEN")
+    
+    async def call(self, func: Callable, *args, **kwargs):
+        """Execute function with circuit breaker protection (rebound per instance in __init__)."""
+        return await self.call(func, *args, **kwargs)
+    
+    async def _call_with_timeout(self, func: Callable, *args, **kwargs):
+        """Execute function with circuit breaker protection and config.timeout."""
+        self._admit()
         
         try:
             # Execute with timeout
@@ -87,55 +140,96 @@ class CircuitBreaker:
                 timeout=self.config.timeout
             )
             
-            await self._on_success()
+            self._on_success()
             return result
             
         except Exception as e:
-            await self._on_failure(e)
+            self._on_failure(e)
             raise
     
-    def _should_attempt_reset(self) -> bool:
-        """Check if enough time has passed to attempt reset."""
-        if self.last_failure_time is None:
-            return True
+    async def _call_no_timeout(self, func: Callable, *args, **kwargs):
+        """Execute function with circuit breaker protection, leaving timeouts to func."""
+        self._admit()
         
-        time_since_failure = time.time() - self.last_failure_time
-        return time_since_failure >= self.config.recovery_timeout
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._on_failure(e)
+            raise
+        
+        self._on_success()
+        return result
+    
+    async def stream(self, func: Callable, *args, **kwargs):
+        """
+        Iterate an async generator with circuit breaker protection.
+        
+        The call is only counted as a success once the stream is exhausted;
+        an error while streaming counts as a failure. A consumer that stops
+        early is counted as neither.
+        """
+        self._admit()
+        
+        try:
+            async for chunk in func(*args, **kwargs):
+                yield chunk
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            self._on_failure(e)
+            raise
+        
+        self._on_success()
     
-    async def _on_success(self):
+    def _on_success(self):
         """Handle successful operation."""
-        if self.state == CircuitState.HALF_OPEN:
+        if self.state is CircuitState.HALF_OPEN:
             self.success_count += 1
             
             if self.success_count >= self.config.success_threshold:
                 self.state = CircuitState.CLOSED
                 self.failure_count = 0
                 self.success_count = 0
-                self.logger.info(f"Circuit breaker {self.name} closed (recovered)")
+                self.logger.info("Circuit breaker %s closed (recovered)", self.name, extra=self._log_extra)
         
-        elif self.state == CircuitState.CLOSED:
+        elif self.state is CircuitState.CLOSED:
             self.failure_count = 0  # Reset failure count on success
     
-    async def _on_failure(self, exception: Exception):
+    def _on_failure(self, exception: Exception):
         """Handle failed operation."""
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = _mono()
         
-        if self.state == CircuitState.CLOSED:
+        if self.state is CircuitState.CLOSED:
             if self.failure_count >= self.config.failure_threshold:
                 self.state = CircuitState.OPEN
-                self.logger.warning(f"Circuit breaker {self.name} opened due to failures")
+                self.logger.warning("Circuit breaker %s opened due to failures", self.name, extra=self._log_extra)
         
-        elif self.state == CircuitState.HALF_OPEN:
+        elif self.state is CircuitState.HALF_OPEN:
             self.state = CircuitState.OPEN
             self.success_count = 0
-            self.logger.warning(f"Circuit breaker {self.name} reopened after failed recovery")
+            self.logger.warning("Circuit breaker %s reopened after failed recovery", self.name, extra=self._log_extra)
         
-        self.logger.debug(f"Circuit breaker {self.name} failure: {exception}")
+        self.logger.debug("Circuit breaker %s failure: %s", self.name, exception, extra=self._log_extra)
 
 
 class ConnectionPool:
-    """Enhanced connection pool for HTTP operations."""
+    """
+    Enhanced connection pool for HTTP operations.
+    
+    Use ConnectionPool.instance() to share one session (and its keep-alive
+    connections) across the process instead of opening one per component.
+    """
+    
+    # Process-wide pool returned by instance()
+    _instance: Optional['ConnectionPool'] = None
+    
+    @classmethod
+    def instance(cls, config: ConnectionPoolConfig = None) -> 'ConnectionPool':
+        """Return the shared pool; config only applies when it is first created."""
+        if cls._instance is None:
+            cls._instance = cls(config)
+        return cls._instance
     
     def __init__(self, config: ConnectionPoolConfig = None):
         """Initialize connection pool."""
@@ -165,7 +259,10 @@ class ConnectionPool:
                 limit=self.config.max_connections,
                 limit_per_host=self.config.max_connections_per_host,
                 keepalive_timeout=self.config.keepalive_timeout,
-                enable_cleanup_closed=True
+                ttl_dns_cache=self.config.dns_cache_ttl,
+                force_close=False,
+                enable_cleanup_closed=True,
+                resolver=aiohttp.AsyncResolver() if aiodns is not None else None
             )
             
             self.session = aiohttp.ClientSession(
@@ -173,7 +270,7 @@ class ConnectionPool:
                 timeout=timeout
             )
             
-            self.logger.info(f"Connection pool started with {self.config.max_connections} max connections")
+            self.logger.info("Connection pool started with %d max connections", self.config.max_connections)
     
     async def close(self):
         """Close the connection pool."""
@@ -182,6 +279,13 @@ class ConnectionPool:
             self.session = None
             self.logger.info("Connection pool closed")
     
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, starting the pool if needed."""
+        if not self.session:
+            await self.start()
+        
+        return self.session
+    
     async def get(self, url: str, **kwargs) -> aiohttp.ClientResponse:
         """Perform GET request using pool."""
         if not self.session:
@@ -195,6 +299,63 @@ class ConnectionPool:
             await self.start()
         
         return await self.session.post(url, **kwargs)
+    
+    async def stream(self, url: str, chunk_size: int = 65536, **kwargs):
+        """Yield the body of a GET response in chunks instead of buffering it."""
+        if not self.session:
+            await self.start()
+        
+        async with self.session.get(url, **kwargs) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+
+class AdmissionGate:
+    """Counting admission limit that, unlike a semaphore, can be resized while in use."""
+    
+    def __init__(self, limit: int):
+        """Initialize admission gate."""
+        self._limit = limit
+        self._active = 0
+        self._cond = asyncio.Condition()
+    
+    @property
+    def limit(self) -> int:
+        """Maximum number of concurrent holders."""
+        return self._limit
+    
+    @property
+    def active(self) -> int:
+        """Number of slots currently held."""
+        return self._active
+    
+    async def acquire(self):
+        """Wait until a slot is free and take it."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+    
+    async def release(self):
+        """Return a slot and wake one waiter."""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def set_limit(self, limit: int):
+        """Change the limit; holders above a lowered limit finish normally."""
+        async with self._cond:
+            self._limit = limit
+            self._cond.notify_all()
+    
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        """Hold a slot for the duration of the block."""
+        await asyncio.wait_for(self.acquire(), timeout=timeout)
+        try:
+            yield
+        finally:
+            await self.release()
 
 
 class ConcurrencyController:
@@ -203,54 +364,56 @@ class ConcurrencyController:
     def __init__(self, config: ConcurrencyConfig = None):
         """Initialize concurrency controller."""
         self.config = config or ConcurrencyConfig()
-        self.target_semaphore = asyncio.Semaphore(self.config.max_concurrent_targets)
-        self.operation_semaphore = asyncio.Semaphore(self.config.max_concurrent_operations)
+        self.target_gate = AdmissionGate(self.config.max_concurrent_targets)
+        self.operation_gate = AdmissionGate(self.config.max_concurrent_operations)
         self.logger = logging.getLogger('telemetry.concurrency')
         
-    @asynccontextmanager
-    async def target_slot(self):
+    def target_slot(self):
         """Acquire slot for target processing."""
-        try:
-            await asyncio.wait_for(
-                self.target_semaphore.acquire(),
-                timeout=self.config.semaphore_timeout
-            )
-            yield
-        finally:
-            self.target_semaphore.release()
+        return self.target_gate.slot(self.config.semaphore_timeout)
     
-    @asynccontextmanager
-    async def operation_slot(self):
+    def operation_slot(self):
         """Acquire slot for operation processing."""
-        try:
-            await asyncio.wait_for(
-                self.operation_semaphore.acquire(),
-                timeout=self.config.semaphore_timeout
-            )
-            yield
-        finally:
-            self.operation_semaphore.release()
+        return self.operation_gate.slot(self.config.semaphore_timeout)
+    
+    async def set_max_targets(self, limit: int):
+        """Resize target concurrency at runtime."""
+        await self.target_gate.set_limit(limit)
+        self.logger.info("Target concurrency limit set to %d", limit)
+    
+    async def set_max_operations(self, limit: int):
+        """Resize operation concurrency at runtime."""
+        await self.operation_gate.set_limit(limit)
+        self.logger.info("Operation concurrency limit set to %d", limit)
     
     async def run_batched(self, items: List, func: Callable, *args, **kwargs) -> List:
-        """Run function on items in batches."""
-        results = []
-        batch_size = self.config.batch_size
+        """
+        Run function on every item with bounded concurrency.
+        
+        A fixed set of worker_pool_size workers pulls items from a queue, so a
+        new item starts as soon as any worker is free instead of waiting for a
+        whole batch to finish. Each call holds an operation slot while it runs.
+        Results (or raised exceptions) are returned in item order.
+        """
+        results: List = [None] * len(items)
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, item in enumerate(items):
+            queue.put_nowait((index, item))
+        
+        async def worker():
+            while True:
+                try:
+                    index, item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    async with self.operation_slot():
+                        results[index] = await func(item, *args, **kwargs)
+                except Exception as e:
+                    results[index] = e
         
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            batch_tasks = []
-            
-            for item in batch:
-                async with self.operation_slot():
-                    task = asyncio.create_task(func(item, *args, **kwargs))
-                    batch_tasks.append(task)
-            
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            results.extend(batch_results)
-            
-            # Small delay between batches to prevent overwhelming
-            if i + batch_size < len(items):
-                await asyncio.sleep(0.1)
+        worker_count = min(self.config.worker_pool_size, len(items))
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
         
         return results
 
@@ -268,8 +431,9 @@ class RetryPolicy:
         self.logger = logging.getLogger('telemetry.retry')
     
     async def execute(self, func: Callable, *args, **kwargs):
-        """Execute function with retry policy."""
+        """Execute function with retry policy (decorrelated-jitter backoff)."""
         last_exception = None
+        delay = self.base_delay
         
         for attempt in range(self.max_retries + 1):
             try:
@@ -279,26 +443,26 @@ class RetryPolicy:
                 last_exception = e
                 
                 if attempt == self.max_retries:
-                    self.logger.error(f"All {self.max_retries} retry attempts failed")
+                    self.logger.error("All %d retry attempts failed", self.max_retries)
                     raise
                 
-                delay = min(
-                    self.base_delay * (self.backoff_factor ** attempt),
-                    self.max_delay
-                )
-                
-                # Add jitter to prevent thundering herd
-                jitter = random.uniform(0.1, 0.3) * delay
-                total_delay = delay + jitter
+                # Draw from [base, previous * 3] so concurrent callers spread out
+                delay = min(self.max_delay, random.uniform(self.base_delay, delay * 3))
                 
-                self.logger.warning(f"Attempt {attempt + 1} failed, retrying in {total_delay:.2f}s: {e}")
-                await asyncio.sleep(total_delay)
+                self.logger.warning("Attempt %d failed, retrying in %.2fs: %s", attempt + 1, delay, e)
+                await asyncio.sleep(delay)
         
         raise last_exception
 
 
 class WorkerPool:
-    """Worker pool for processing tasks concurrently."""
+    """
+    Worker pool for processing tasks concurrently.
+    
+    Only worth using when unrelated callers need shared backpressure through
+    one bounded queue; to fan out a known set of calls, create tasks directly
+    and bound them with a semaphore (see process_targets_concurrently).
+    """
     
     def __init__(self, worker_count: int = 10, queue_size: int = 1000):
         """Initialize worker pool."""
@@ -320,7 +484,7 @@ class WorkerPool:
             worker = asyncio.create_task(self._worker(f"worker-{i}"))
             self.workers.append(worker)
         
-        self.logger.info(f"Started worker pool with {self.worker_count} workers")
+        self.logger.info("Started worker pool with %d workers", self.worker_count)
     
     async def stop(self):
         """Stop worker pool."""
@@ -349,9 +513,25 @@ class WorkerPool:
         await self.queue.put(task)
         return future
     
+    async def submit_many(self, func: Callable, items: List) -> List[asyncio.Future]:
+        """Submit func(item) for every item, enqueueing without yielding while there is room."""
+        if not self.running:
+            await self.start()
+        
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        for item, future in zip(items, futures):
+            task = (func, (item,), {}, future)
+            try:
+                self.queue.put_nowait(task)
+            except asyncio.QueueFull:
+                await self.queue.put(task)
+        
+        return futures
+    
     async def _worker(self, name: str):
         """Worker coroutine."""
-        self.logger.debug(f"Worker {name} started")
+        self.logger.debug("Worker %s started", name)
         
         while self.running:
             try:
@@ -363,17 +543,31 @@ class WorkerPool:
                 func, args, kwargs, future = task
                 
                 try:
-                    result = await func(*args, **kwargs)
-                    future.set_result(result)
-                except Exception as e:
-                    future.set_exception(e)
+                    if future.done():  # Cancelled before a worker picked it up
+                        continue
+                    
+                    # Cancelling the caller's future cancels the running call
+                    run = asyncio.ensure_future(func(*args, **kwargs))
+                    future.add_done_callback(lambda _, run=run: run.cancel())
+                    
+                    try:
+                        result = await run
+                    except asyncio.CancelledError:
+                        if not future.cancelled():
+                            raise
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
                 finally:
                     self.queue.task_done()
             
             except Exception as e:
-                self.logger.error(f"Worker {name} error: {e}")
+                self.logger.error("Worker %s error: %s", name, e)
         
-        self.logger.debug(f"Worker {name} stopped")
+        self.logger.debug("Worker %s stopped", name)
 
 
 class ScalingManager:
@@ -384,27 +578,25 @@ class ScalingManager:
         self.config = config
         self.connection_pool = None
         self.concurrency_controller = None
-        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.circuit_breakers: 'OrderedDict[str, CircuitBreaker]' = OrderedDict()
         self.retry_policy = RetryPolicy()
         self.worker_pool = None
+        self._cpu_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
         self.logger = logging.getLogger('telemetry.scaling')
         
+        # Reused by get_scaling_metrics, which fills it in place
+        self._metrics: Dict[str, Any] = {
+            'circuit_breakers': {},
+            'connection_pool': {},
+            'concurrency': {},
+            'worker_pool': {}
+        }
+        
         # Load scaling configuration from environment
         self._load_scaling_config()
     
     def _load_scaling_config(self):
         """Load scaling configuration from environment variables."""
-        import os
-        
-        # Connection pool config
-        pool_config = ConnectionPoolConfig(
-            max_connections=int(os.getenv('MAX_CONNECTIONS', '100')),
-            max_connections_per_host=int(os.getenv('MAX_CONNECTIONS_PER_HOST', '30')),
-            keepalive_timeout=int(os.getenv('KEEPALIVE_TIMEOUT', '30')),
-            connection_timeout=float(os.getenv('CONNECTION_TIMEOUT', '10.0')),
-            read_timeout=float(os.getenv('READ_TIMEOUT', '30.0'))
-        )
-        
         # Concurrency config
         concurrency_config = ConcurrencyConfig(
             max_concurrent_targets=int(os.getenv('MAX_CONCURRENT_TARGETS', '50')),
@@ -413,6 +605,19 @@ class ScalingManager:
             worker_pool_size=int(os.getenv('WORKER_POOL_SIZE', '20'))
         )
         
+        # Connection pool config; per-host connections default to the operation
+        # concurrency so concurrent requests to one host are not turned away
+        pool_config = ConnectionPoolConfig(
+            max_connections=int(os.getenv('MAX_CONNECTIONS', '100')),
+            max_connections_per_host=int(os.getenv(
+                'MAX_CONNECTIONS_PER_HOST', concurrency_config.max_concurrent_operations
+            )),
+            keepalive_timeout=int(os.getenv('KEEPALIVE_TIMEOUT', '60')),
+            connection_timeout=float(os.getenv('CONNECTION_TIMEOUT', '10.0')),
+            read_timeout=float(os.getenv('READ_TIMEOUT', '30.0')),
+            dns_cache_ttl=int(os.getenv('DNS_CACHE_TTL', '300'))
+        )
+        
         # Circuit breaker config
         circuit_config = CircuitBreakerConfig(
             failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5')),
@@ -421,7 +626,8 @@ class ScalingManager:
             timeout=float(os.getenv('CIRCUIT_TIMEOUT', '10.0'))
         )
         
-        self.connection_pool = ConnectionPool(pool_config)
+        self.pool_config = pool_config
+        self.connection_pool = ConnectionPool.instance(pool_config)
         self.concurrency_controller = ConcurrencyController(concurrency_config)
         self.circuit_breaker_config = circuit_config
         
@@ -429,13 +635,11 @@ class ScalingManager:
     
     async def start(self):
         """Start scaling components."""
+        self.connection_pool = ConnectionPool.instance(self.pool_config)
         await self.connection_pool.start()
         
-        if not self.worker_pool:
-            self.worker_pool = WorkerPool(
-                worker_count=self.concurrency_controller.config.worker_pool_size
-            )
-            await self.worker_pool.start()
+        if self._cpu_pool is None:
+            self._cpu_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
         
         self.logger.info("Scaling manager started")
     
@@ -447,19 +651,53 @@ class ScalingManager:
         if self.worker_pool:
             await self.worker_pool.stop()
         
+        if self._cpu_pool:
+            # Don't block the loop waiting on busy workers; pending work is dropped
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+        
         self.logger.info("Scaling manager stopped")
     
-    def get_circuit_breaker(self, name: str) -> CircuitBreaker:
-        """Get or create circuit breaker for service."""
-        if name not in self.circuit_breakers:
-            self.circuit_breakers[name] = CircuitBreaker(name, self.circuit_breaker_config)
+    async def run_cpu(self, func: Callable, *args):
+        """
+        Run CPU-bound func(*args) in the process pool so it cannot stall the event loop.
+        
+        func and its arguments must be picklable (module-level functions).
+        """
+        if self._cpu_pool is None:
+            self._cpu_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
         
-        return self.circuit_breakers[name]
+        return await asyncio.get_running_loop().run_in_executor(self._cpu_pool, func, *args)
     
-    async def execute_with_scaling(self, name: str, func: Callable, *args, **kwargs):
-        """Execute function with all scaling features."""
+    def get_circuit_breaker(self, name: str) -> CircuitBreaker:
+        """Get or create circuit breaker for service (least recently used beyond _CB_CACHE_MAX are dropped)."""
+        key = sys.intern(name)
+        breaker = self.circuit_breakers.get(key)
+        if breaker is not None:
+            self.circuit_breakers.move_to_end(key)
+            return breaker
+        
+        breaker = self.circuit_breakers[key] = CircuitBreaker(key, self.circuit_breaker_config)
+        if len(self.circuit_breakers) > _CB_CACHE_MAX:
+            self.circuit_breakers.popitem(last=False)
+        
+        return breaker
+    
+    async def execute_with_scaling(self, name: str, func: Callable, *args,
+                                   is_stream: bool = False, **kwargs):
+        """
+        Execute function with all scaling features.
+        
+        With is_stream=True, func must be an async generator function (e.g.
+        ConnectionPool.stream); the return value is an async iterator whose
+        circuit breaker outcome is recorded when the stream ends. Streams are
+        not retried, since chunks may already have been consumed.
+        """
         circuit_breaker = self.get_circuit_breaker(name)
         
+        if is_stream:
+            return circuit_breaker.stream(func, *args, **kwargs)
+        
         async def protected_func():
             return await self.retry_policy.execute(func, *args, **kwargs)
         
@@ -467,62 +705,81 @@ class ScalingManager:
     
     async def process_targets_concurrently(self, targets: List[str], 
                                          process_func: Callable) -> List:
-        """Process multiple targets with concurrency control."""
-        results = []
+        """
+        Process multiple targets with concurrency control.
+        
+        process_func runs on the event loop; it should hand parsing or other
+        CPU work taking more than about a millisecond to run_cpu().
+        """
+        workers = asyncio.Semaphore(self.concurrency_controller.config.worker_pool_size)
         
         async def process_target(target):
-            async with self.concurrency_controller.target_slot():
-                return await self.execute_with_scaling(
-                    f"target_{target}", 
-                    process_func, 
-                    target
-                )
-        
-        # Use worker pool for processing
-        tasks = []
-        for target in targets:
-            future = await self.worker_pool.submit(process_target, target)
-            tasks.append(future)
+            try:
+                async with workers, self.concurrency_controller.target_slot():
+                    return await self.execute_with_scaling(
+                        target, 
+                        process_func, 
+                        target
+                    )
+            except Exception as e:
+                return e
         
-        # Wait for all tasks with timeout
+        # Run every target as its own task; on timeout the task group cancels
+        # whatever is still pending
+        tasks = []
         try:
-            results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=300  # 5 minute timeout
-            )
-        except asyncio.TimeoutError:
+            async with asyncio.timeout(300):  # 5 minute timeout
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [tg.create_task(process_target(target)) for target in targets]
+        except TimeoutError:
             self.logger.error("Target processing timed out")
-            results = [Exception("Timeout") for _ in targets]
+        
+        results = [
+            task.result() if task.done() and not task.cancelled() else Exception("Timeout")
+            for task in tasks
+        ]
         
         return results
     
-    def get_scaling_metrics(self) -> Dict[str, Any]:
-        """Get current scaling metrics."""
-        metrics = {
-            'circuit_breakers': {},
-            'connection_pool': {
-                'max_connections': self.connection_pool.config.max_connections,
-                'session_active': self.connection_pool.session is not None
-            },
-            'concurrency': {
-                'target_slots_available': self.concurrency_controller.target_semaphore._value,
-                'operation_slots_available': self.concurrency_controller.operation_semaphore._value,
-                'max_concurrent_targets': self.concurrency_controller.config.max_concurrent_targets,
-                'max_concurrent_operations': self.concurrency_controller.config.max_concurrent_operations
-            },
-            'worker_pool': {
-                'worker_count': self.worker_pool.worker_count if self.worker_pool else 0,
-                'queue_size': self.worker_pool.queue.qsize() if self.worker_pool else 0,
-                'running': self.worker_pool.running if self.worker_pool else False
-            }
-        }
-        
-        # Add circuit breaker states
+    def get_scaling_metrics(self, serialize: bool = False) -> Union[Dict[str, Any], bytes]:
+        """
+        Get current scaling metrics, or their JSON encoding if serialize is set.
+        
+        The returned dict is reused and updated in place by the next call, so
+        callers that keep a snapshot must copy it. Call from the event loop
+        thread only.
+        """
+        metrics = self._metrics
+        target_gate = self.concurrency_controller.target_gate
+        operation_gate = self.concurrency_controller.operation_gate
+        
+        pool = metrics['connection_pool']
+        pool['max_connections'] = self.connection_pool.config.max_connections
+        pool['session_active'] = self.connection_pool.session is not None
+        
+        concurrency = metrics['concurrency']
+        concurrency['target_slots_available'] = max(target_gate.limit - target_gate.active, 0)
+        concurrency['operation_slots_available'] = max(operation_gate.limit - operation_gate.active, 0)
+        concurrency['max_concurrent_targets'] = target_gate.limit
+        concurrency['max_concurrent_operations'] = operation_gate.limit
+        
+        workers = metrics['worker_pool']
+        workers['worker_count'] = self.worker_pool.worker_count if self.worker_pool else 0
+        workers['queue_size'] = self.worker_pool.queue.qsize() if self.worker_pool else 0
+        workers['running'] = self.worker_pool.running if self.worker_pool else False
+        
+        # Circuit breaker states; entries for evicted breakers are dropped
+        breakers = metrics['circuit_breakers']
+        for name in breakers.keys() - self.circuit_breakers.keys():
+            del breakers[name]
         for name, breaker in self.circuit_breakers.items():
-            metrics['circuit_breakers'][name] = {
-                'state': breaker.state.value,
-                'failure_count': breaker.failure_count,
-                'success_count': breaker.success_count
-            }
-        
+            entry = breakers.get(name)
+            if entry is None:
+                entry = breakers[name] = {}
+            entry['state'] = breaker.state.value
+            entry['failure_count'] = breaker.failure_count
+            entry['success_count'] = breaker.success_count
+        
+        if serialize:
+            return _dumps(metrics)
         return metrics
\ No newline at end of file
@@ -6,34 +6,341 @@ Includes integrated service runner and sample data collection capabilities.
 """
 
 import asyncio
+import bisect
+import copy
+import ipaddress
 import logging
 import re
 import subprocess
 import time
 import socket
 import json
+import statistics
+import struct
 import signal
+import threading
 import os
-from typing import Dict, Any, List, Optional
+import random
+from collections import OrderedDict
+from math import asin, cos, radians, sin, sqrt
+from typing import Dict, Any, List, Optional, Tuple
+
+import aiohttp
+
+try:
+    import numpy as np
+except ImportError:  # Optional; batches are then scored one row at a time
+    np = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:  # Optional; the QoS kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 from .database import InfluxDBClient
-from .config import Config
+from .config import Config, get_config
+
+# Decoder for HTTP API response bodies (both accept bytes)
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Geolocation of an IP rarely changes; cache lookups for a day
+GEO_CACHE_TTL = 24 * 60 * 60
+GEO_CACHE_MAX = 1024
+
+# Our public IP can change (DHCP, failover), so it is re-checked more often
+PUBLIC_IP_CACHE_TTL = 300
+
+# Ping summary statistics, in the order ping prints them
+_RTT_FIELDS = ('rtt_min', 'rtt_avg', 'rtt_max', 'rtt_mdev')
+
+# Dashboard aliases stored alongside each RTT field
+_RTT_ALIASES = (
+    ('rtt_min', 'min_latency'),
+    ('rtt_avg', 'avg_latency'),
+    ('rtt_max', 'max_latency'),
+    ('rtt_mdev', 'stddev_latency'),
+)
+
+# Simulated HTTP status by network performance: the worse of latency (ms)
+# and packet loss (%) picks the code, rising a level above each threshold
+_HTTP_LATENCY_THRESHOLDS = (200, 500, 1000)
+_HTTP_LOSS_THRESHOLDS = (1, 5, 10)
+_HTTP_STATUS_CODES = (
+    200,  # OK (green)
+    408,  # Request Timeout (yellow)
+    504,  # Gateway Timeout (red)
+    503,  # Service Unavailable (red)
+)
+
+# Response time category bounds (ms): <100 excellent, <300 good,
+# <1000 acceptable, otherwise poor (categories 1-4)
+_RESPONSE_CATEGORY_BOUNDS = (100, 300, 1000)
+
+# Traffic intensity bounds (packets/s): above 100 medium, above 1000 high
+_TRAFFIC_INTENSITY_BOUNDS = (100, 1000)
+
+# Simulated application and database query types: (response time
+# multiplier range low, high, type code). Four entries each, so one is
+# picked with a 2-bit random draw.
+_APP_PROFILES = (
+    (0.8, 1.5, 1),  # Web application
+    (0.5, 1.2, 2),  # API service
+    (1.2, 2.5, 3),  # Database application
+    (0.3, 1.0, 4),  # File service
+)
+_QUERY_PROFILES = (
+    (0.5, 1.0, 1),  # Simple SELECT
+    (1.5, 3.0, 2),  # Complex WHERE/ORDER BY
+    (2.0, 4.0, 3),  # JOIN operations
+    (1.8, 3.5, 4),  # GROUP BY/COUNT/SUM
+)
+
+# Simulated interface tiers: (util field, used-Mbps field, capacity in
+# Mbps, utilization relative to the measured path)
+_INTERFACE_TIERS = tuple(
+    (f'interface_{name}_util_pct', f'interface_{name}_used_mbps', capacity_mbps, factor)
+    for name, capacity_mbps, factor in (
+        ('1gb', 1000.0, 1.0),     # Gigabit
+        ('10gb', 10000.0, 0.1),   # 10 Gigabit, assumed less congested
+        ('100mb', 100.0, 1.5),    # 100 Megabit, assumed more congested
+    )
+)
+
+# Geolocation fields stored for a measurement, with their types
+_GEO_FIELDS = (
+    ('target_ip', str), ('source_ip', str),
+    ('target_latitude', float), ('target_longitude', float),
+    ('target_country', str), ('target_region', str), ('target_city', str),
+    ('target_timezone', str), ('target_isp', str),
+    ('source_latitude', float), ('source_longitude', float),
+    ('source_country', str), ('source_region', str), ('source_city', str),
+    ('source_timezone', str), ('source_isp', str),
+    ('distance_km', float),
+)
+
+# The ping summary ("--- stats ---", counts, rtt) is within the last lines
+_PING_SUMMARY_LINES = 4
+
+# Pattern for validating public IP service responses
+_RE_PUBLIC_IP = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
+
+# Services that echo our public IP; queried concurrently
+PUBLIC_IP_SERVICES = (
+    'https://api.ipify.org',
+    'https://ifconfig.me/ip',
+    'https://ipinfo.io/ip'
+)
+
+# Twice the mean Earth radius (6371 km), for the haversine distance
+EARTH_DIAMETER_KM = 12742.0
+
+# Per-request limits for lookups made on the shared HTTP session
+PUBLIC_IP_TIMEOUT = aiohttp.ClientTimeout(total=5)
+GEOLOCATION_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+# Traffic class quality scores: each starts at 100 and loses
+# (value - threshold) * slope for latency and jitter above their thresholds,
+# and (loss - loss_base) * slope for packet loss above its threshold.
+# Columns: name, latency threshold/slope, loss threshold/base/slope,
+# jitter threshold/slope (None where jitter does not matter)
+_QOS_CLASSES = (
+    ('voice', 150, 0.5, 1, 0, 10, None, None),   # Most sensitive to latency and loss
+    ('video', 200, 0.3, 0.5, 0, 8, 30, 0.5),     # Tolerates more latency, not jitter
+    ('data', 500, 0.1, 3, 3, 5, None, None),     # Retransmits, so most tolerant
+)
+
+# _QOS_CLASSES as all-float rows for the compiled kernel; a missing jitter
+# threshold becomes +inf so the comparison is simply never true
+_QOS_KERNEL_TABLE = tuple(
+    (float(lat_max), float(lat_slope), float(loss_max), float(loss_base), float(loss_slope),
+     float('inf') if jitter_max is None else float(jitter_max),
+     0.0 if jitter_slope is None else float(jitter_slope))
+    for _, lat_max, lat_slope, loss_max, loss_base, loss_slope, jitter_max, jitter_slope in _QOS_CLASSES
+)
+
+# Smallest batch worth scoring with NumPy; below this the scalar path is faster
+QOS_BATCH_MIN = 32
+
+# In-process traceroute: UDP probes to consecutive ports, as traceroute(8) does
+TRACEROUTE_MAX_HOPS = 30
+TRACEROUTE_PROBES_PER_HOP = 3
+TRACEROUTE_BASE_PORT = 33434
+TRACEROUTE_TIMEOUT = 3.0
+
+# In-process ping: echo requests on an unprivileged ICMP socket, spaced
+# like ping(8) at its fastest non-root interval, with its default payload
+PING_INTERVAL = 0.2
+PING_PAYLOAD = bytes(56)
+_ICMP_ECHO_REPLY = 0
+_ICMP_ECHO_REQUEST = 8
+
+# ICMP types that answer a traceroute probe
+_ICMP_TIME_EXCEEDED = 11
+_ICMP_DEST_UNREACHABLE = 3
+
+
+def _parse_icmp_reply(packet: bytes) -> Optional[Tuple[int, str, int, int]]:
+    """
+    Decode an ICMP error read from a raw socket.
+    
+    Returns (icmp type, original destination, original UDP source port,
+    original UDP destination port), or None if the packet is not an ICMP
+    error quoting a UDP datagram.
+    """
+    if len(packet) < 20:
+        return None
+    ihl = (packet[0] & 0x0F) * 4
+    icmp_type = packet[ihl] if len(packet) > ihl else None
+    if icmp_type not in (_ICMP_TIME_EXCEEDED, _ICMP_DEST_UNREACHABLE):
+        return None
+    
+    # The ICMP payload quotes the original IP header plus 8 bytes of UDP
+    inner = ihl + 8
+    if len(packet) < inner + 20 or packet[inner + 9] != socket.IPPROTO_UDP:
+        return None
+    inner_ihl = (packet[inner] & 0x0F) * 4
+    udp = inner + inner_ihl
+    if len(packet) < udp + 4:
+        return None
+    src_port, dst_port = struct.unpack_from('!HH', packet, udp)
+    return icmp_type, socket.inet_ntoa(packet[inner + 16:inner + 20]), src_port, dst_port
+
+
+def _is_ipv4(token: str) -> bool:
+    """Return True if token looks like a dotted-quad IPv4 address."""
+    octets = token.split('.')
+    return len(octets) == 4 and all(octet.isdigit() for octet in octets)
+
+
+def _no_route() -> Dict[str, Any]:
+    """Traceroute result for when no route could be traced."""
+    return {'hop_count': 0, 'route_path': {'hops': [], 'ips': [], 'avg_times': []}}
+
+
+@njit(cache=True)
+def _class_score(row, latency, loss, jitter):
+    """Quality score (0-100) of one _QOS_KERNEL_TABLE row."""
+    lat_max, lat_slope, loss_max, loss_base, loss_slope, jitter_max, jitter_slope = row
+    score = 100.0
+    if latency > lat_max:
+        score -= (latency - lat_max) * lat_slope
+    if loss > loss_max:
+        score -= (loss - loss_base) * loss_slope
+    if jitter > jitter_max:
+        score -= (jitter - jitter_max) * jitter_slope
+    return max(0.0, min(100.0, score))
+
+
+@njit(cache=True)
+def _qos_kernel(latency, loss, jitter):
+    """
+    Voice, video and data quality scores for one measurement.
+    
+    Compiled with Numba when it is installed. Pass NaN for an unknown jitter.
+    """
+    return (_class_score(_QOS_KERNEL_TABLE[0], latency, loss, jitter),
+            _class_score(_QOS_KERNEL_TABLE[1], latency, loss, jitter),
+            _class_score(_QOS_KERNEL_TABLE[2], latency, loss, jitter))
+
+
+def _quality_scores_batch(rows: List[Dict[str, Any]]) -> List[Tuple[float, float, float]]:
+    """
+    Score voice/video/data quality for many raw metric rows at once with NumPy.
+    
+    Each row must have rtt_avg and packet_loss. Uses the same formulas as
+    NetworkTelemetry._add_qos_metrics and returns one
+    (voice, video, data) tuple per row.
+    """
+    latency = np.array([float(row['rtt_avg']) for row in rows])
+    loss = np.array([float(row['packet_loss']) for row in rows])
+    jitter = np.array([
+        float(row['rtt_mdev']) if 'rtt_mdev' in row
+        else float(row['rtt_max']) - float(row['rtt_min']) if 'rtt_min' in row and 'rtt_max' in row
+        else np.nan
+        for row in rows
+    ])
+    
+    columns = []
+    for _, lat_max, lat_slope, loss_max, loss_base, loss_slope, jitter_max, jitter_slope in _QOS_CLASSES:
+        score = (100.0
+                 - np.where(latency > lat_max, (latency - lat_max) * lat_slope, 0.0)
+                 - np.where(loss > loss_max, (loss - loss_base) * loss_slope, 0.0))
+        if jitter_max is not None:
+            score -= np.where(jitter > jitter_max, (jitter - jitter_max) * jitter_slope, 0.0)
+        columns.append(score)
+    
+    scores = np.clip(np.stack(columns, axis=1), 0.0, 100.0)
+    return [tuple(row) for row in scores.tolist()]
+
+
+# Resolved target addresses are reused for this long; failures only briefly
+DNS_CACHE_TTL = 900
+DNS_NEGATIVE_TTL = 30
+
+
+class _CollectorState:
+    """Mutable state shared by a collector and the per-target clones made from it."""
+    
+    __slots__ = ('public_ip', 'public_ip_lock', 'icmp_ping', 'raw_traceroute')
+    
+    def __init__(self):
+        # (monotonic time fetched, address); the lock lets concurrent clones
+        # wait for a single lookup instead of each starting their own
+        self.public_ip: Optional[Tuple[float, str]] = None
+        self.public_ip_lock = asyncio.Lock()
+        
+        # Cleared if unprivileged ICMP sockets are not permitted; then ping(8) is used
+        self.icmp_ping = True
+        
+        # Cleared if raw ICMP sockets are not permitted; then traceroute(8) is used
+        self.raw_traceroute = True
 
 
 class NetworkTelemetry:
     """Network telemetry collector for monitoring and storing network metrics."""
     
-    def __init__(self, config: Config):
-        """Initialize network telemetry with configuration."""
+    def __init__(self, config: Config, session=None):
+        """Initialize network telemetry, optionally with an aiohttp session to reuse."""
         self.config = config
         self.target_fqdn = config.target_fqdn
         self.logger = logging.getLogger(__name__)
         self.influx_client = None
+        self._session = session
+        
+        # ip or network -> (monotonic time cached, geolocation), least recently used first
+        self._geo_cache: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        
+        # hostname -> (monotonic expiry, address or None for a failed lookup)
+        self._dns_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        
+        # target -> (monotonic time tested, reachable)
+        self._conn_cache: Dict[str, Tuple[float, bool]] = {}
+        
+        # Public IP and ICMP capability flags; a reference shared with clones
+        self._state = _CollectorState()
+        
+        # Tags shared by every processed point for this target; never mutated
+        self._tags: Dict[str, str] = {'target': self.target_fqdn}
+        
+    async def _get_session(self):
+        """Return the injected HTTP session, or the shared pool's session."""
+        if self._session is not None:
+            return self._session
+        from .scaling import ConnectionPool
+        return await ConnectionPool.instance().get_session()
         
     async def initialize(self) -> bool:
         """Initialize the telemetry system."""
         try:
             self.influx_client = InfluxDBClient(self.config)
+            # Geolocation names are written on every point; escape them once
+            self.influx_client.preload_field_keys(name for name, _ in _GEO_FIELDS)
             return await self.influx_client.initialize()
         except Exception as e:
             self.logger.error(f"Failed to initialize telemetry: {e}")
@@ -54,10 +361,12 @@ class NetworkTelemetry:
                 self.logger.warning("No valid metrics to store")
                 return False
                 
-            # Store in InfluxDB
+            # Queue for InfluxDB; the batching write API groups points across
+            # cycles (MONITORING_BATCH_SIZE / MONITORING_FLUSH_MS) and close() drains it
             success = await self.influx_client.write_metrics(processed_metrics)
             if success:
-                self.logger.info(f"Metrics stored successfully: {self._get_metrics_summary(processed_metrics)}")
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("Metrics stored successfully: %s", self._get_metrics_summary(processed_metrics))
             
             return success
             
@@ -65,32 +374,89 @@ class NetworkTelemetry:
             self.logger.error(f"Error in collect_and_store_metrics: {e}")
             return False
     
+    async def collect_and_store_metrics_batch(self, targets: List[str]) -> int:
+        """
+        Collect metrics for several targets concurrently and store them in one write.
+        
+        At most config.sample_concurrency targets are measured at a time.
+        Returns the number of targets whose metrics were stored.
+        """
+        semaphore = asyncio.Semaphore(self.config.sample_concurrency)
+        
+        async def collect(target: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._for_target(target)._collect_network_metrics()
+        
+        try:
+            results = await asyncio.gather(*(collect(target) for target in targets))
+            raw_rows = [row for row in results if row]
+            
+            # Score traffic classes for the whole batch at once when it pays off
+            scores: List[Optional[Tuple[float, float, float]]] = [None] * len(raw_rows)
+            scorable = [i for i, row in enumerate(raw_rows) if 'rtt_avg' in row and 'packet_loss' in row]
+            if np is not None and len(scorable) >= QOS_BATCH_MIN:
+                for i, row_scores in zip(scorable, _quality_scores_batch([raw_rows[i] for i in scorable])):
+                    scores[i] = row_scores
+            
+            processed = [self._process_metrics(row, row_scores) for row, row_scores in zip(raw_rows, scores)]
+            processed = [metrics for metrics in processed if metrics]
+            if not processed:
+                self.logger.warning("No valid metrics to store")
+                return 0
+            
+            if not await self.influx_client.write_metrics(processed):
+                return 0
+            self.logger.info(f"Metrics stored for {len(processed)}/{len(targets)} targets")
+            return len(processed)
+            
+        except Exception as e:
+            self.logger.error(f"Error in collect_and_store_metrics_batch: {e}")
+            return 0
+    
+    def set_target(self, target: str) -> None:
+        """Point this collector at another target, keeping its InfluxDB client and caches."""
+        self.target_fqdn = target
+    
+    def _for_target(self, target: str) -> 'NetworkTelemetry':
+        """Return a collector for another target sharing this one's clients, caches and state."""
+        collector = copy.copy(self)
+        collector.set_target(target)
+        return collector
+    
+    async def collect_single_measurement(self, target: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Collect one set of raw network metrics, optionally for another target."""
+        collector = self._for_target(target) if target else self
+        return await collector._collect_network_metrics()
+    
     async def _collect_network_metrics(self) -> Optional[Dict[str, Any]]:
         """Collect comprehensive network metrics."""
         try:
-            # Collect ping, traceroute, and geolocation metrics concurrently
-            ping_task = self._collect_ping_metrics()
-            traceroute_task = self._collect_traceroute_metrics()
-            geolocation_task = self._collect_geolocation_metrics()
-            
-            ping_metrics, traceroute_metrics, geolocation_metrics = await asyncio.gather(
+            # Collect ping, traceroute, and geolocation metrics concurrently,
+            # each capped so one slow part cannot hold up the whole cycle
+            ping_task = asyncio.wait_for(self._collect_ping_metrics(),
+                                         self.config.ping_timeout_total)
+            traceroute_task = asyncio.wait_for(self._collect_traceroute_metrics(),
+                                               self.config.traceroute_timeout_total)
+            geolocation_task = asyncio.wait_for(self._collect_geolocation_metrics(),
+                                                self.config.geo_timeout_total)
+            
+            results = await asyncio.gather(
                 ping_task, traceroute_task, geolocation_task, return_exceptions=True
             )
             
-            # Handle exceptions from tasks
-            if isinstance(ping_metrics, Exception):
-                self.logger.error(f"Ping collection failed: {ping_metrics}")
-                ping_metrics = None
-            if isinstance(traceroute_metrics, Exception):
-                self.logger.error(f"Traceroute collection failed: {traceroute_metrics}")
-                traceroute_metrics = None
-            if isinstance(geolocation_metrics, Exception):
-                self.logger.error(f"Geolocation collection failed: {geolocation_metrics}")
-                geolocation_metrics = None
+            # Handle timeouts and exceptions from tasks
+            for i, name in enumerate(('Ping', 'Traceroute', 'Geolocation')):
+                if isinstance(results[i], asyncio.TimeoutError):
+                    self.logger.warning(f"{name} collection timed out")
+                    results[i] = None
+                elif isinstance(results[i], Exception):
+                    self.logger.error(f"{name} collection failed: {results[i]}")
+                    results[i] = None
+            ping_metrics, traceroute_metrics, geolocation_metrics = results
             
             # Combine metrics
             metrics = {
-                'timestamp': int(time.time()),
+                'timestamp': time.time_ns() // 1_000_000_000,
                 'target': self.target_fqdn,
                 'collection_duration': 0
             }
@@ -110,6 +476,23 @@ class NetworkTelemetry:
     
     async def _collect_ping_metrics(self) -> Optional[Dict[str, Any]]:
         """Collect ping-based metrics (latency, packet loss)."""
+        if self._state.icmp_ping:
+            target_ip = await self._resolve_hostname(self.target_fqdn)
+            if target_ip and ':' not in target_ip:
+                try:
+                    metrics = await self._ping(target_ip)
+                except PermissionError:
+                    self.logger.info("ICMP sockets not permitted, falling back to ping command")
+                    self._state.icmp_ping = False
+                except Exception as e:
+                    self.logger.error(f"Ping collection error: {e}")
+                    return None
+                else:
+                    if not metrics.get('packets_received'):
+                        self.logger.error(f"No ping replies from {self.target_fqdn}")
+                        return None
+                    return metrics
+        
         try:
             cmd = [
                 'ping', '-c', str(self.config.ping_count),
@@ -129,38 +512,102 @@ class NetworkTelemetry:
                 self.logger.error(f"Ping command failed: {stderr.decode()}")
                 return None
                 
-            return self._parse_ping_output(stdout.decode())
+            return self._parse_ping_output(stdout)
             
         except Exception as e:
             self.logger.error(f"Ping collection error: {e}")
             return None
     
-    def _parse_ping_output(self, output: str) -> Dict[str, Any]:
-        """Parse ping command output to extract metrics."""
+    async def _ping(self, target_ip: str, count: Optional[int] = None,
+                    timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Ping an IPv4 address without spawning ping(8).
+        
+        Sends count (default config.ping_count) echo requests on a datagram
+        ICMP socket and waits up to timeout (default config.ping_timeout)
+        seconds after the last one for replies. Needs
+        the process group to be within net.ipv4.ping_group_range (or
+        CAP_NET_RAW); raises PermissionError otherwise. Returns the same
+        fields as _parse_ping_output.
+        """
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        replies: Dict[int, asyncio.Future] = {}
+        
+        def on_readable():
+            while True:
+                try:
+                    # Datagram ICMP sockets return the ICMP message without the IP header
+                    packet = sock.recv(1024)
+                except (BlockingIOError, InterruptedError):
+                    return
+                if len(packet) < 8 or packet[0] != _ICMP_ECHO_REPLY:
+                    continue
+                future = replies.get(struct.unpack_from('!H', packet, 6)[0])
+                if future is not None and not future.done():
+                    future.set_result(time.perf_counter())
+        
+        count = count or self.config.ping_count
+        sent_at: Dict[int, float] = {}
+        try:
+            sock.setblocking(False)
+            loop.add_reader(sock.fileno(), on_readable)
+            
+            # The kernel fills in the identifier and checksum
+            for seq in range(1, count + 1):
+                if seq > 1:
+                    await asyncio.sleep(PING_INTERVAL)
+                replies[seq] = loop.create_future()
+                sent_at[seq] = time.perf_counter()
+                sock.sendto(struct.pack('!BBHHH', _ICMP_ECHO_REQUEST, 0, 0, 0, seq) + PING_PAYLOAD,
+                            (target_ip, 0))
+            
+            await asyncio.wait(replies.values(), timeout=timeout or self.config.ping_timeout)
+        finally:
+            loop.remove_reader(sock.fileno())
+            sock.close()
+        
+        rtts = [(future.result() - sent_at[seq]) * 1000
+                for seq, future in replies.items() if future.done()]
+        metrics = {
+            'packets_transmitted': count,
+            'packets_received': len(rtts),
+            'packet_loss': (count - len(rtts)) * 100.0 / count,
+        }
+        if rtts:
+            metrics['rtt_min'] = min(rtts)
+            metrics['rtt_avg'] = statistics.fmean(rtts)
+            metrics['rtt_max'] = max(rtts)
+            metrics['rtt_mdev'] = statistics.pstdev(rtts, metrics['rtt_avg'])
+        return metrics
+    
+    def _parse_ping_output(self, output: bytes) -> Dict[str, Any]:
+        """
+        Parse raw ping command output to extract metrics.
+        
+        Only the summary at the end of the output is scanned, and numbers are
+        converted straight from bytes without decoding.
+        """
         metrics = {}
         
         try:
-            # Extract packet loss
-            loss_match = re.search(r'(\d+)% packet loss', output)
-            if loss_match:
-                metrics['packet_loss'] = float(loss_match.group(1))
-            
-            # Extract packet counts
-            transmitted_match = re.search(r'(\d+) packets transmitted', output)
-            received_match = re.search(r'(\d+) received', output)
-            
-            if transmitted_match:
-                metrics['packets_transmitted'] = int(transmitted_match.group(1))
-            if received_match:
-                metrics['packets_received'] = int(received_match.group(1))
-            
-            # Extract RTT statistics
-            rtt_match = re.search(r'rtt min/avg/max/mdev = ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+) ms', output)
-            if rtt_match:
-                metrics['rtt_min'] = float(rtt_match.group(1))
-                metrics['rtt_avg'] = float(rtt_match.group(2))
-                metrics['rtt_max'] = float(rtt_match.group(3))
-                metrics['rtt_mdev'] = float(rtt_match.group(4))
+            for line in output.rstrip().rsplit(b'\n', _PING_SUMMARY_LINES)[-_PING_SUMMARY_LINES:]:
+                if b'packets transmitted' in line:
+                    # e.g. "5 packets transmitted, 4 received, 20% packet loss, time 4005ms"
+                    for part in line.split(b','):
+                        value, _, label = part.strip().partition(b' ')
+                        if label.startswith(b'packets transmitted'):
+                            metrics['packets_transmitted'] = int(value)
+                        elif label.startswith((b'received', b'packets received')):
+                            metrics['packets_received'] = int(value)
+                        elif label.startswith(b'packet loss') and value.endswith(b'%'):
+                            metrics['packet_loss'] = float(value[:-1])
+                
+                elif line.startswith((b'rtt ', b'round-trip ')):
+                    # e.g. "rtt min/avg/max/mdev = 10.1/12.2/15.3/1.4 ms"
+                    values = line.partition(b'=')[2].split(None, 1)[0].split(b'/')
+                    for name, value in zip(_RTT_FIELDS, values):
+                        metrics[name] = float(value)
             
             return metrics
             
@@ -170,6 +617,18 @@ class NetworkTelemetry:
     
     async def _collect_traceroute_metrics(self) -> Dict[str, Any]:
         """Collect traceroute-based metrics (hop count, route path)."""
+        if self._state.raw_traceroute:
+            target_ip = await self._resolve_hostname(self.target_fqdn)
+            if target_ip and ':' not in target_ip:
+                try:
+                    return await self._trace_route(target_ip)
+                except PermissionError:
+                    self.logger.info("Raw ICMP sockets not permitted, falling back to traceroute command")
+                    self._state.raw_traceroute = False
+                except Exception as e:
+                    self.logger.error(f"Traceroute collection error: {e}")
+                    return _no_route()
+        
         try:
             cmd = ['traceroute', '-m', '30', self.target_fqdn]
             
@@ -186,59 +645,138 @@ class NetworkTelemetry:
             
             if process.returncode != 0:
                 self.logger.warning(f"Traceroute command failed: {stderr.decode()}")
-                return {'hop_count': 0, 'route_path': []}
+                return _no_route()
                 
             return self._parse_traceroute_output(stdout.decode())
             
         except asyncio.TimeoutError:
             self.logger.warning("Traceroute timed out")
-            return {'hop_count': 0, 'route_path': []}
+            return _no_route()
         except Exception as e:
             self.logger.error(f"Traceroute collection error: {e}")
-            return {'hop_count': 0, 'route_path': []}
+            return _no_route()
+    
+    async def _trace_route(self, target_ip: str) -> Dict[str, Any]:
+        """
+        Trace the route to an IPv4 address without spawning traceroute(8).
+        
+        Probes for every TTL are sent at once and ICMP replies are read from
+        a raw socket on the event loop, so the whole trace takes about one
+        TRACEROUTE_TIMEOUT instead of one round trip per hop. Requires
+        CAP_NET_RAW; raises PermissionError otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        replies: Dict[int, asyncio.Future] = {}
+        
+        def on_readable():
+            while True:
+                try:
+                    packet, (address, _) = receiver.recvfrom(512)
+                except (BlockingIOError, InterruptedError):
+                    return
+                reply = _parse_icmp_reply(packet)
+                if reply is None:
+                    continue
+                icmp_type, dst, src_port, dst_port = reply
+                future = replies.get(dst_port)
+                if dst == target_ip and src_port == local_port and future is not None and not future.done():
+                    future.set_result((address, time.perf_counter(), icmp_type))
+        
+        try:
+            receiver.setblocking(False)
+            sender.setblocking(False)
+            sender.bind(('', 0))
+            local_port = sender.getsockname()[1]
+            loop.add_reader(receiver.fileno(), on_readable)
+            
+            sent_at: Dict[int, Tuple[int, float]] = {}
+            for ttl in range(1, TRACEROUTE_MAX_HOPS + 1):
+                sender.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+                for probe in range(TRACEROUTE_PROBES_PER_HOP):
+                    port = TRACEROUTE_BASE_PORT + (ttl - 1) * TRACEROUTE_PROBES_PER_HOP + probe
+                    replies[port] = loop.create_future()
+                    sent_at[port] = (ttl, time.perf_counter())
+                    sender.sendto(b'', (target_ip, port))
+            
+            await asyncio.wait(replies.values(), timeout=TRACEROUTE_TIMEOUT)
+        finally:
+            loop.remove_reader(receiver.fileno())
+            receiver.close()
+            sender.close()
+        
+        # Group answers by hop; the trace ends at the first hop the target answered from
+        hops: Dict[int, Tuple[str, List[float]]] = {}
+        last_hop = TRACEROUTE_MAX_HOPS
+        for port, future in replies.items():
+            if not future.done():
+                continue
+            ttl, sent = sent_at[port]
+            address, received, icmp_type = future.result()
+            ip, times = hops.setdefault(ttl, (address, []))
+            times.append((received - sent) * 1000)
+            if address == target_ip or icmp_type == _ICMP_DEST_UNREACHABLE:
+                last_hop = min(last_hop, ttl)
+        
+        hop_nums, ips, avg_times = [], [], []
+        for ttl, (ip, times) in sorted(hops.items()):
+            if ttl > last_hop:
+                break
+            hop_nums.append(ttl)
+            ips.append(ip)
+            avg_times.append(sum(times) / len(times))
+        
+        return {
+            'hop_count': hop_nums[-1] if hop_nums else 0,
+            'route_path': {'hops': hop_nums, 'ips': ips, 'avg_times': avg_times}
+        }
     
     def _parse_traceroute_output(self, output: str) -> Dict[str, Any]:
-        """Parse traceroute command output to extract hop count and route information."""
+        """
+        Parse traceroute command output to extract hop count and route information.
+        
+        route_path holds parallel 'hops', 'ips' and 'avg_times' lists, one
+        entry per responding hop.
+        """
         try:
             lines = output.strip().split('\n')
-            route_path = []
+            hop_nums, ips, avg_times = [], [], []
             hop_count = 0
             
             for line in lines[1:]:  # Skip header line
-                if not line.strip():
+                # e.g. " 2  router.lan (10.0.0.1)  12.345 ms  12.234 ms  12.456 ms"
+                parts = line.split()
+                if len(parts) < 2 or not parts[0].isdigit():
                     continue
-                    
-                # Extract hop number and IP
-                hop_match = re.match(r'\s*(\d+)\s+(.+)', line)
-                if hop_match:
-                    hop_num = int(hop_match.group(1))
-                    hop_info = hop_match.group(2)
-                    
-                    # Extract IP address (first IP found in the line)
-                    ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', hop_info)
-                    if ip_match:
-                        ip = ip_match.group(1)
-                        
-                        # Extract timing information
-                        times = re.findall(r'([\d.]+) ms', hop_info)
-                        avg_time = sum(float(t) for t in times) / len(times) if times else 0
-                        
-                        route_path.append({
-                            'hop': hop_num,
-                            'ip': ip,
-                            'avg_time': avg_time
-                        })
-                        
-                        hop_count = hop_num
+                hop_num = int(parts[0])
+                
+                # Extract IP address (first one on the line, possibly in parentheses)
+                for token in parts[1:]:
+                    ip = token.strip('()')
+                    if _is_ipv4(ip):
+                        break
+                else:
+                    continue
+                
+                # Extract timing information: each value is followed by "ms"
+                times = [float(parts[i - 1]) for i in range(2, len(parts)) if parts[i] == 'ms']
+                avg_time = sum(times) / len(times) if times else 0
+                
+                hop_nums.append(hop_num)
+                ips.append(ip)
+                avg_times.append(avg_time)
+                
+                hop_count = hop_num
             
             return {
                 'hop_count': hop_count,
-                'route_path': route_path
+                'route_path': {'hops': hop_nums, 'ips': ips, 'avg_times': avg_times}
             }
             
         except Exception as e:
             self.logger.error(f"Error parsing traceroute output: {e}")
-            return {'hop_count': 0, 'route_path': []}
+            return _no_route()
     
     async def _collect_geolocation_metrics(self) -> Dict[str, Any]:
         """Collect geolocation data for the target and source."""
@@ -294,63 +832,113 @@ class NetworkTelemetry:
             return {}
     
     async def _resolve_hostname(self, hostname: str) -> Optional[str]:
-        """Resolve hostname to IP address."""
+        """Resolve hostname to IP address, caching the answer (and briefly, failures)."""
+        entry = self._dns_cache.get(hostname)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, socket.gethostbyname, hostname)
+            loop = asyncio.get_running_loop()
+            infos = await loop.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
+            result = infos[0][4][0]
+            self._dns_cache[hostname] = (time.monotonic() + DNS_CACHE_TTL, result)
             return result
         except Exception as e:
             self.logger.error(f"Failed to resolve hostname {hostname}: {e}")
+            self._dns_cache[hostname] = (time.monotonic() + DNS_NEGATIVE_TTL, None)
             return None
     
     async def _get_public_ip(self) -> Optional[str]:
         """Get our public IP address."""
+        state = self._state
+        if state.public_ip is not None and time.monotonic() - state.public_ip[0] < PUBLIC_IP_CACHE_TTL:
+            return state.public_ip[1]
+        
+        async with state.public_ip_lock:
+            # Another clone may have fetched it while we waited
+            if state.public_ip is not None and time.monotonic() - state.public_ip[0] < PUBLIC_IP_CACHE_TTL:
+                return state.public_ip[1]
+            
+            try:
+                # Ask every service at once and take the first valid answer
+                session = await self._get_session()
+                pending = {asyncio.create_task(self._fetch_ip(session, url)) for url in PUBLIC_IP_SERVICES}
+                try:
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            ip = task.result()
+                            if ip:
+                                state.public_ip = (time.monotonic(), ip)
+                                return ip
+                finally:
+                    for task in pending:
+                        task.cancel()
+                return None
+            except Exception as e:
+                self.logger.error(f"Failed to get public IP: {e}")
+                return None
+    
+    async def _fetch_ip(self, session, url: str) -> Optional[str]:
+        """Ask one service for our public IP; None unless it returns a valid address."""
         try:
-            # Try multiple services for reliability
-            services = [
-                'https://api.ipify.org',
-                'https://ifconfig.me/ip',
-                'https://ipinfo.io/ip'
-            ]
-            import aiohttp
-            import re
-            ip_regex = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                for service in services:
-                    try:
-                        async with session.get(service) as response:
-                            if response.status == 200:
-                                ip = (await response.text()).strip()
-                                if ip_regex.match(ip):
-                                    return ip
-                    except Exception:
-                        continue
-            return None
-        except Exception as e:
-            self.logger.error(f"Failed to get public IP: {e}")
-            return None
+            async with session.get(url, timeout=PUBLIC_IP_TIMEOUT) as response:
+                if response.status == 200:
+                    ip = (await response.text()).strip()
+                    if _RE_PUBLIC_IP.match(ip):
+                        return ip
+        except Exception:
+            pass
+        return None
+    
+    def _geo_cache_key(self, ip: str) -> str:
+        """
+        Return the geolocation cache key for an IP address.
+        
+        IPv4 addresses share an entry per config.geo_prefix_bits network,
+        since neighbouring addresses almost always geolocate alike; other
+        addresses are cached individually.
+        """
+        bits = self.config.geo_prefix_bits
+        if bits >= 32 or ':' in ip:
+            return ip
+        try:
+            return str(ipaddress.IPv4Network((ip, bits), strict=False).network_address)
+        except ValueError:
+            return ip
     
     async def _get_geolocation(self, ip: str) -> Dict[str, Any]:
         """Get geolocation data for an IP address."""
+        key = self._geo_cache_key(ip)
+        entry = self._geo_cache.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < GEO_CACHE_TTL:
+                self._geo_cache.move_to_end(key)
+                return entry[1]
+            del self._geo_cache[key]
+        
         try:
             # Using ip-api.com (free service, no API key required)
             url = f"http://ip-api.com/json/{ip}?fields=status,country,regionName,city,lat,lon,timezone,isp,query"
             
-            import aiohttp
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('status') == 'success':
-                            return {
-                                'latitude': data.get('lat', 0.0),
-                                'longitude': data.get('lon', 0.0),
-                                'country': data.get('country', 'unknown'),
-                                'region': data.get('regionName', 'unknown'),
-                                'city': data.get('city', 'unknown'),
-                                'timezone': data.get('timezone', 'unknown'),
-                                'isp': data.get('isp', 'unknown')
-                            }
+            session = await self._get_session()
+            async with session.get(url, timeout=GEOLOCATION_TIMEOUT) as response:
+                if response.status == 200:
+                    data = _loads(await response.read())
+                    if data.get('status') == 'success':
+                        geo = {
+                            'latitude': data.get('lat', 0.0),
+                            'longitude': data.get('lon', 0.0),
+                            'country': data.get('country', 'unknown'),
+                            'region': data.get('regionName', 'unknown'),
+                            'city': data.get('city', 'unknown'),
+                            'timezone': data.get('timezone', 'unknown'),
+                            'isp': data.get('isp', 'unknown')
+                        }
+                        self._geo_cache[key] = (time.monotonic(), geo)
+                        if len(self._geo_cache) > GEO_CACHE_MAX:
+                            self._geo_cache.popitem(last=False)
+                        return geo
             
             return {}
             
@@ -359,109 +947,94 @@ class NetworkTelemetry:
             return {}
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Calculate the great circle distance between two points on Earth."""
-        import math
-        
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        # Radius of earth in kilometers
-        r = 6371
-        
-        return c * r
+        """Calculate the great circle distance between two points on Earth (haversine)."""
+        lat1_r = radians(lat1)
+        lat2_r = radians(lat2)
+        dlat = radians(lat2 - lat1)
+        dlon = radians(lon2 - lon1)
+        a = sin(dlat * 0.5) ** 2 + cos(lat1_r) * cos(lat2_r) * sin(dlon * 0.5) ** 2
+        return EARTH_DIAMETER_KM * asin(sqrt(a))
     
-    def _process_metrics(self, raw_metrics: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Process and validate raw metrics for storage."""
+    def _process_metrics(self, raw_metrics: Dict[str, Any],
+                         quality_scores: Optional[Tuple[float, float, float]] = None) -> Optional[Dict[str, Any]]:
+        """Process and validate raw metrics for storage, optionally with precomputed quality scores."""
         try:
             if not raw_metrics.get('target'):
                 self.logger.error("Missing target in metrics")
                 return None
             
-            # Create the measurement structure
-            processed = {
-                'measurement': 'network_telemetry',
-                'tags': {
-                    'target': raw_metrics['target']
-                },
-                'fields': {},
-                'timestamp': raw_metrics.get('timestamp', int(time.time()))
-            }
-            
-            # Process ping metrics
-            ping_fields = self._extract_ping_fields(raw_metrics)
-            processed['fields'].update(ping_fields)
-            
-            # Process traceroute metrics
-            traceroute_fields = self._extract_traceroute_fields(raw_metrics)
-            processed['fields'].update(traceroute_fields)
-            
-            # Process geolocation metrics
-            geolocation_fields = self._extract_geolocation_fields(raw_metrics)
-            processed['fields'].update(geolocation_fields)
+            # Each extractor writes straight into the one fields dict
+            fields: Dict[str, Any] = {}
+            self._extract_ping_fields(raw_metrics, quality_scores, fields)
+            self._extract_traceroute_fields(raw_metrics, fields)
+            self._extract_geolocation_fields(raw_metrics, fields)
             
             # Add collection metadata
-            processed['fields']['collection_duration'] = raw_metrics.get('collection_duration', 0)
-            
-            return processed if processed['fields'] else None
+            fields['collection_duration'] = raw_metrics.get('collection_duration', 0)
+            
+            # Create the measurement structure, sharing the tags dict between
+            # points; consumers must treat 'tags' as read-only
+            target = raw_metrics['target']
+            if self._tags['target'] != target:
+                self._tags = {'target': target}
+            timestamp = raw_metrics.get('timestamp')
+            return {
+                'measurement': 'network_telemetry',
+                'tags': self._tags,
+                'fields': fields,
+                'timestamp': timestamp if timestamp is not None else time.time_ns() // 1_000_000_000
+            }
             
         except Exception as e:
             self.logger.error(f"Error processing metrics: {e}")
             return None
     
-    def _extract_ping_fields(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract and validate ping-related fields."""
-        fields = {}
-        
-        # RTT metrics
-        if 'rtt_min' in metrics:
-            fields['rtt_min'] = float(metrics['rtt_min'])
-            fields['min_latency'] = float(metrics['rtt_min'])  # Dashboard alias
-        if 'rtt_avg' in metrics:
-            fields['rtt_avg'] = float(metrics['rtt_avg'])
-            fields['avg_latency'] = float(metrics['rtt_avg'])  # Dashboard alias
-        if 'rtt_max' in metrics:
-            fields['rtt_max'] = float(metrics['rtt_max'])
-            fields['max_latency'] = float(metrics['rtt_max'])  # Dashboard alias
-        if 'rtt_mdev' in metrics:
-            fields['rtt_mdev'] = float(metrics['rtt_mdev'])
-            fields['stddev_latency'] = float(metrics['rtt_mdev'])  # Dashboard alias
+    def _extract_ping_fields(self, metrics: Dict[str, Any],
+                             quality_scores: Optional[Tuple[float, float, float]] = None,
+                             fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract and validate ping-related fields, adding them to fields if given."""
+        if fields is None:
+            fields = {}
+        
+        # RTT metrics, each converted once and stored under its dashboard alias too
+        for name, alias in _RTT_ALIASES:
+            value = metrics.get(name)
+            if value is not None:
+                fields[name] = fields[alias] = float(value)
         
         # Packet metrics
-        if 'packet_loss' in metrics:
-            fields['packet_loss'] = float(metrics['packet_loss'])
-        if 'packets_transmitted' in metrics:
-            fields['packets_transmitted'] = int(metrics['packets_transmitted'])
-        if 'packets_received' in metrics:
-            fields['packets_received'] = int(metrics['packets_received'])
+        packet_loss = metrics.get('packet_loss')
+        if packet_loss is not None:
+            fields['packet_loss'] = packet_loss = float(packet_loss)
+        packets_transmitted = metrics.get('packets_transmitted')
+        if packets_transmitted is not None:
+            fields['packets_transmitted'] = int(packets_transmitted)
+        packets_received = metrics.get('packets_received')
+        if packets_received is not None:
+            fields['packets_received'] = int(packets_received)
         
         # Add HTTP status code simulation based on network performance
-        if 'rtt_avg' in metrics and 'packet_loss' in metrics:
-            latency = float(metrics['rtt_avg'])
-            packet_loss = float(metrics['packet_loss'])
-            
-            # Simulate HTTP status based on network performance
-            if packet_loss > 10 or latency > 1000:
-                fields['http_status_code'] = 503  # Service Unavailable (red)
-            elif packet_loss > 5 or latency > 500:
-                fields['http_status_code'] = 504  # Gateway Timeout (red)
-            elif packet_loss > 1 or latency > 200:
-                fields['http_status_code'] = 408  # Request Timeout (yellow)
-            else:
-                fields['http_status_code'] = 200  # OK (green)
+        latency = fields.get('rtt_avg')
+        if latency is not None and packet_loss is not None:
+            
+            # bisect_left counts the thresholds strictly exceeded
+            level = max(bisect.bisect_left(_HTTP_LATENCY_THRESHOLDS, latency),
+                        bisect.bisect_left(_HTTP_LOSS_THRESHOLDS, packet_loss))
+            fields['http_status_code'] = _HTTP_STATUS_CODES[level]
         
         # Calculate QoS metrics based on available data
-        self._add_qos_metrics(fields, metrics)
+        self._add_qos_metrics(fields, metrics, quality_scores)
         
         return fields
     
-    def _add_qos_metrics(self, fields: Dict[str, Any], raw_metrics: Dict[str, Any]) -> None:
-        """Add Quality of Service metrics based on network performance data."""
+    def _add_qos_metrics(self, fields: Dict[str, Any], raw_metrics: Dict[str, Any],
+                         quality_scores: Optional[Tuple[float, float, float]] = None) -> None:
+        """
+        Add Quality of Service metrics based on network performance data.
+        
+        quality_scores, if given, are (voice, video, data) scores already
+        computed for this row by _quality_scores_batch.
+        """
         try:
             # Jitter calculation (variation in latency)
             if 'rtt_mdev' in raw_metrics:
@@ -482,35 +1055,17 @@ class NetworkTelemetry:
                 fields['buffer_utilization_pct'] = min(100.0, (fields['queue_depth'] / max_buffer) * 100.0)
             
             # Traffic class performance simulation
-            if 'rtt_avg' in raw_metrics and 'packet_loss' in raw_metrics:
-                latency = float(raw_metrics['rtt_avg'])
-                packet_loss = float(raw_metrics['packet_loss'])
-                
-                # Voice traffic (most sensitive to latency/jitter)
-                voice_quality_score = 100.0
-                if latency > 150:  # Voice quality degrades above 150ms
-                    voice_quality_score -= (latency - 150) * 0.5
-                if packet_loss > 1:  # Voice very sensitive to packet loss
-                    voice_quality_score -= packet_loss * 10
-                fields['voice_quality_score'] = max(0.0, min(100.0, voice_quality_score))
-                
-                # Video traffic (sensitive to jitter and packet loss)
-                video_quality_score = 100.0
-                if latency > 200:  # Video can tolerate more latency than voice
-                    video_quality_score -= (latency - 200) * 0.3
-                if packet_loss > 0.5:  # Video sensitive to packet loss
-                    video_quality_score -= packet_loss * 8
-                if 'jitter_ms' in fields and fields['jitter_ms'] > 30:
-                    video_quality_score -= (fields['jitter_ms'] - 30) * 0.5
-                fields['video_quality_score'] = max(0.0, min(100.0, video_quality_score))
-                
-                # Data traffic (most tolerant)
-                data_quality_score = 100.0
-                if latency > 500:  # Data can tolerate high latency
-                    data_quality_score -= (latency - 500) * 0.1
-                if packet_loss > 3:  # Data tolerates some packet loss (retransmission)
-                    data_quality_score -= (packet_loss - 3) * 5
-                fields['data_quality_score'] = max(0.0, min(100.0, data_quality_score))
+            if quality_scores is not None:
+                (fields['voice_quality_score'],
+                 fields['video_quality_score'],
+                 fields['data_quality_score']) = quality_scores
+            elif 'rtt_avg' in raw_metrics and 'packet_loss' in raw_metrics:
+                (fields['voice_quality_score'],
+                 fields['video_quality_score'],
+                 fields['data_quality_score']) = _qos_kernel(
+                    float(raw_metrics['rtt_avg']),
+                    float(raw_metrics['packet_loss']),
+                    fields.get('jitter_ms', float('nan')))
             
             # Congestion indicators
             if 'packet_loss' in raw_metrics and 'rtt_avg' in raw_metrics:
@@ -637,6 +1192,7 @@ class NetworkTelemetry:
     
     def _add_throughput_metrics(self, fields: Dict[str, Any], raw_metrics: Dict[str, Any]) -> None:
         """Add throughput and bandwidth metrics based on network performance data."""
+        out = {}  # Collected locally and merged into fields in one update
         try:
             # Base calculations from ping data
             packet_size_bytes = 64  # Standard ping packet size
@@ -650,19 +1206,20 @@ class NetworkTelemetry:
                 
                 # Effective throughput based on successful packet transmission
                 if latency_ms > 0:
-                    # Bytes per second calculation
+                    # Bytes per second calculation (transfer time floored at 1ms)
                     transfer_time_sec = (latency_ms / 1000.0) * ping_count
+                    per_second = 1.0 / (transfer_time_sec if transfer_time_sec > 0.001 else 0.001)
                     bytes_transferred = successful_packets * packet_size_bytes
                     
                     # Throughput metrics
-                    fields['bytes_per_second'] = bytes_transferred / max(transfer_time_sec, 0.001)
-                    fields['bits_per_second'] = fields['bytes_per_second'] * 8
-                    fields['packets_per_second'] = successful_packets / max(transfer_time_sec, 0.001)
+                    out['bytes_per_second'] = bytes_per_second = bytes_transferred * per_second
+                    out['bits_per_second'] = bits_per_second = bytes_per_second * 8
+                    out['packets_per_second'] = successful_packets * per_second
                     
-                    # Convert to common units
-                    fields['throughput_kbps'] = fields['bits_per_second'] / 1000.0
-                    fields['throughput_mbps'] = fields['bits_per_second'] / 1000000.0
-                    fields['throughput_gbps'] = fields['bits_per_second'] / 1000000000.0
+                    # Convert to common units, each scaled from the previous
+                    out['throughput_kbps'] = kbps = bits_per_second * 1e-3
+                    out['throughput_mbps'] = mbps = kbps * 1e-3
+                    out['throughput_gbps'] = mbps * 1e-3
             
             # Simulate bandwidth utilization based on network performance
             # In real implementation, this would come from SNMP or network device APIs
@@ -680,77 +1237,63 @@ class NetworkTelemetry:
                     congestion_factor = min(20.0, packet_loss * 5.0)
                     base_utilization += congestion_factor
                 
-                fields['bandwidth_utilization_pct'] = min(100.0, max(0.0, base_utilization))
+                out['bandwidth_utilization_pct'] = min(100.0, max(0.0, base_utilization))
             
             # Interface metrics simulation
             # In production, these would come from network device monitoring
-            if 'bandwidth_utilization_pct' in fields:
-                utilization = fields['bandwidth_utilization_pct']
-                
+            utilization = out.get('bandwidth_utilization_pct')
+            if utilization is not None:
                 # Simulate different interface types and their utilization
-                # Gigabit interface (1000 Mbps)
-                gigabit_capacity_mbps = 1000.0
-                fields['interface_1gb_util_pct'] = min(100.0, utilization)
-                fields['interface_1gb_used_mbps'] = (utilization / 100.0) * gigabit_capacity_mbps
-                
-                # 10 Gigabit interface
-                ten_gig_capacity_mbps = 10000.0
-                ten_gig_util = min(100.0, utilization * 0.1)  # Assume less congested
-                fields['interface_10gb_util_pct'] = ten_gig_util
-                fields['interface_10gb_used_mbps'] = (ten_gig_util / 100.0) * ten_gig_capacity_mbps
-                
-                # 100 Megabit interface
-                hundred_mb_capacity_mbps = 100.0
-                hundred_mb_util = min(100.0, utilization * 1.5)  # More congested
-                fields['interface_100mb_util_pct'] = hundred_mb_util
-                fields['interface_100mb_used_mbps'] = (hundred_mb_util / 100.0) * hundred_mb_capacity_mbps
+                for util_field, used_field, capacity_mbps, factor in _INTERFACE_TIERS:
+                    tier_util = min(100.0, utilization * factor)
+                    out[util_field] = tier_util
+                    out[used_field] = (tier_util / 100.0) * capacity_mbps
             
             # Network efficiency metrics
-            if 'throughput_mbps' in fields and 'bandwidth_utilization_pct' in fields:
+            if 'throughput_mbps' in out and 'bandwidth_utilization_pct' in out:
                 # Calculate network efficiency (actual vs theoretical)
                 theoretical_capacity = 100.0  # Assume 100 Mbps baseline
-                actual_throughput = fields['throughput_mbps']
+                actual_throughput = out['throughput_mbps']
                 
-                fields['network_efficiency_pct'] = min(100.0, (actual_throughput / theoretical_capacity) * 100.0)
+                out['network_efficiency_pct'] = min(100.0, (actual_throughput / theoretical_capacity) * 100.0)
                 
                 # Goodput (application-level throughput accounting for overhead)
                 protocol_overhead = 0.15  # 15% overhead for TCP/IP
-                fields['goodput_mbps'] = actual_throughput * (1 - protocol_overhead)
+                out['goodput_mbps'] = actual_throughput * (1 - protocol_overhead)
             
             # Traffic flow metrics
-            if 'packets_per_second' in fields:
-                pps = fields['packets_per_second']
+            if 'packets_per_second' in out:
+                pps = out['packets_per_second']
                 
-                # Classify traffic intensity
-                if pps > 1000:
-                    fields['traffic_intensity'] = 3  # High
-                elif pps > 100:
-                    fields['traffic_intensity'] = 2  # Medium
-                else:
-                    fields['traffic_intensity'] = 1  # Low
+                # Classify traffic intensity: 1 low, 2 medium, 3 high
+                out['traffic_intensity'] = bisect.bisect_left(_TRAFFIC_INTENSITY_BOUNDS, pps) + 1
                 
                 # Buffer and queue metrics related to throughput
-                fields['tx_queue_depth'] = min(100, int(pps / 10))  # Simulated transmit queue
-                fields['rx_buffer_usage_pct'] = min(100.0, (pps / 1000.0) * 100.0)
+                out['tx_queue_depth'] = min(100, int(pps / 10))  # Simulated transmit queue
+                out['rx_buffer_usage_pct'] = min(100.0, (pps / 1000.0) * 100.0)
             
             # Performance indicators
-            if 'rtt_avg' in raw_metrics and 'throughput_mbps' in fields:
+            if 'rtt_avg' in raw_metrics and 'throughput_mbps' in out:
                 latency = float(raw_metrics['rtt_avg'])
-                throughput = fields['throughput_mbps']
+                throughput = out['throughput_mbps']
                 
                 # Bandwidth-delay product (network capacity)
                 bdp_mb = (throughput * latency) / 8000.0  # Convert to megabytes
-                fields['bandwidth_delay_product_mb'] = bdp_mb
+                out['bandwidth_delay_product_mb'] = bdp_mb
                 
                 # Round-trip efficiency
                 if latency > 0:
-                    fields['rtt_efficiency_score'] = min(100.0, (100.0 / latency) * 10.0)
+                    out['rtt_efficiency_score'] = min(100.0, (100.0 / latency) * 10.0)
                 
         except Exception as e:
             self.logger.warning(f"Error calculating throughput metrics: {e}")
+        finally:
+            fields.update(out)
     
     def _add_response_time_metrics(self, fields: Dict[str, Any], raw_metrics: Dict[str, Any]) -> None:
         """Add response time metrics based on network performance data."""
+        rand, uniform, getrandbits = random.random, random.uniform, random.getrandbits
+        out = {}  # Collected locally and merged into fields in one update
         try:
             # Base metrics from ping and network data
             total_rtt = float(raw_metrics.get('rtt_avg', 100))  # Total round-trip time
@@ -767,14 +1310,14 @@ class NetworkTelemetry:
                 dns_base_time += dns_penalty
             
             # Simulate DNS cache hit/miss scenarios
-            import random
             cache_hit_probability = 0.7  # 70% cache hit rate
-            if random.random() < cache_hit_probability:
-                fields['dns_resolution_ms'] = max(1.0, dns_base_time * 0.3)  # Cached lookup
-                fields['dns_cache_hit'] = 1
+            if rand() < cache_hit_probability:
+                dns_ms = max(1.0, dns_base_time * 0.3)  # Cached lookup
+                out['dns_cache_hit'] = 1
             else:
-                fields['dns_resolution_ms'] = dns_base_time  # Fresh lookup
-                fields['dns_cache_hit'] = 0
+                dns_ms = dns_base_time  # Fresh lookup
+                out['dns_cache_hit'] = 0
+            out['dns_resolution_ms'] = dns_ms
             
             # TCP handshake time estimation
             # TCP handshake is typically 15-25% of total RTT (3-way handshake)
@@ -788,24 +1331,25 @@ class NetworkTelemetry:
                 tcp_base_time += hop_penalty
             
             # Congestion affects TCP handshake
-            if 'congestion_level_pct' in fields:
-                congestion = fields['congestion_level_pct']
+            congestion = fields.get('congestion_level_pct')
+            if congestion is not None:
                 congestion_penalty = (congestion / 100.0) * 10.0  # Up to 10ms penalty
                 tcp_base_time += congestion_penalty
             
-            fields['tcp_handshake_ms'] = max(0.5, tcp_base_time)
+            out['tcp_handshake_ms'] = tcp_ms = max(0.5, tcp_base_time)
             
             # Application response time
             # Application time = Total RTT - DNS - TCP - Network overhead
             network_overhead = total_rtt * 0.1  # 10% for routing/processing
-            remaining_time = total_rtt - fields['dns_resolution_ms'] - fields['tcp_handshake_ms'] - network_overhead
+            remaining_time = total_rtt - dns_ms - tcp_ms - network_overhead
             
             # Application processing simulation based on HTTP status and performance
             app_base_time = max(10.0, remaining_time)  # Minimum 10ms application time
             
             # Adjust based on HTTP status (from earlier calculation)
-            if 'http_status_code' in fields:
-                status_code = int(fields['http_status_code'])
+            status_code = fields.get('http_status_code')
+            if status_code is not None:
+                status_code = int(status_code)
                 if status_code >= 500:  # Server errors take longer
                     app_base_time *= 2.0
                 elif status_code >= 400:  # Client errors have moderate delay
@@ -814,141 +1358,81 @@ class NetworkTelemetry:
                     pass  # No penalty
             
             # Simulate different application types
-            app_type = random.choice(['web', 'api', 'database', 'file'])
-            if app_type == 'web':
-                fields['app_response_ms'] = app_base_time * random.uniform(0.8, 1.5)
-                fields['app_type'] = 1  # Web application
-            elif app_type == 'api':
-                fields['app_response_ms'] = app_base_time * random.uniform(0.5, 1.2)
-                fields['app_type'] = 2  # API service
-            elif app_type == 'database':
-                fields['app_response_ms'] = app_base_time * random.uniform(1.2, 2.5)
-                fields['app_type'] = 3  # Database application
-            else:  # file
-                fields['app_response_ms'] = app_base_time * random.uniform(0.3, 1.0)
-                fields['app_type'] = 4  # File service
+            low, high, app_type = _APP_PROFILES[getrandbits(2)]
+            app_ms = app_base_time * uniform(low, high)
+            out['app_type'] = app_type
+            out['app_response_ms'] = app_ms
             
             # Database query response time simulation
             # Based on application response time and type
-            if fields['app_type'] == 3:  # Database application
+            if app_type == 3:  # Database application
                 # Direct database access
-                db_query_time = fields['app_response_ms'] * 0.8  # 80% of app time is DB
+                db_query_time = app_ms * 0.8  # 80% of app time is DB
             else:
                 # Secondary database queries
-                db_query_time = fields['app_response_ms'] * 0.3  # 30% involves DB
+                db_query_time = app_ms * 0.3  # 30% involves DB
             
             # Add database-specific factors
-            query_complexity = random.choice(['simple', 'complex', 'join', 'aggregate'])
-            if query_complexity == 'simple':
-                fields['db_query_ms'] = db_query_time * random.uniform(0.5, 1.0)
-                fields['query_type'] = 1  # Simple SELECT
-            elif query_complexity == 'complex':
-                fields['db_query_ms'] = db_query_time * random.uniform(1.5, 3.0)
-                fields['query_type'] = 2  # Complex WHERE/ORDER BY
-            elif query_complexity == 'join':
-                fields['db_query_ms'] = db_query_time * random.uniform(2.0, 4.0)
-                fields['query_type'] = 3  # JOIN operations
-            else:  # aggregate
-                fields['db_query_ms'] = db_query_time * random.uniform(1.8, 3.5)
-                fields['query_type'] = 4  # GROUP BY/COUNT/SUM
+            low, high, out['query_type'] = _QUERY_PROFILES[getrandbits(2)]
+            out['db_query_ms'] = db_query_ms = db_query_time * uniform(low, high)
             
             # Database connection pool status
-            if fields['db_query_ms'] > 100:
-                fields['db_connection_wait_ms'] = random.uniform(5, 20)  # Connection pool delay
+            if db_query_ms > 100:
+                out['db_connection_wait_ms'] = uniform(5, 20)  # Connection pool delay
             else:
-                fields['db_connection_wait_ms'] = random.uniform(0.5, 5)
+                out['db_connection_wait_ms'] = uniform(0.5, 5)
             
             # Total response time breakdown validation
-            total_calculated = (fields['dns_resolution_ms'] + 
-                              fields['tcp_handshake_ms'] + 
-                              fields['app_response_ms'] + 
-                              network_overhead)
+            total_calculated = dns_ms + tcp_ms + app_ms + network_overhead
             
             # Response time efficiency score
             if total_rtt > 0:
-                fields['response_efficiency_pct'] = min(100.0, (50.0 / total_rtt) * 100.0)
+                out['response_efficiency_pct'] = min(100.0, (50.0 / total_rtt) * 100.0)
             
             # Performance indicators
-            fields['total_response_ms'] = total_calculated
+            out['total_response_ms'] = total_calculated
             
             # Response time categories for analysis
-            if total_calculated < 100:
-                fields['response_category'] = 1  # Excellent (<100ms)
-            elif total_calculated < 300:
-                fields['response_category'] = 2  # Good (100-300ms)
-            elif total_calculated < 1000:
-                fields['response_category'] = 3  # Acceptable (300ms-1s)
-            else:
-                fields['response_category'] = 4  # Poor (>1s)
+            out['response_category'] = bisect.bisect_right(_RESPONSE_CATEGORY_BOUNDS, total_calculated) + 1
             
             # Service level indicators
-            fields['response_sla_violation'] = 1 if total_calculated > 500 else 0  # 500ms SLA
+            out['response_sla_violation'] = 1 if total_calculated > 500 else 0  # 500ms SLA
             
         except Exception as e:
             self.logger.warning(f"Error calculating response time metrics: {e}")
+        finally:
+            fields.update(out)
     
-    def _extract_traceroute_fields(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract and validate traceroute-related fields."""
-        fields = {}
+    def _extract_traceroute_fields(self, metrics: Dict[str, Any],
+                                   fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract and validate traceroute-related fields, adding them to fields if given."""
+        if fields is None:
+            fields = {}
         
-        if 'hop_count' in metrics:
-            fields['hop_count'] = int(metrics['hop_count'])
+        hop_count = metrics.get('hop_count')
+        if hop_count is not None:
+            fields['hop_count'] = int(hop_count)
         
-        # Store route path as JSON-like string for simple storage
-        if 'route_path' in metrics and metrics['route_path']:
-            fields['route_path_length'] = len(metrics['route_path'])
+        # Summarize the route path rather than storing every hop
+        ips = metrics.get('route_path', {}).get('ips')
+        if ips:
+            fields['route_path_length'] = len(ips)
             # Store first and last hop IPs for quick analysis
-            if metrics['route_path']:
-                fields['first_hop_ip'] = metrics['route_path'][0].get('ip', '')
-                fields['last_hop_ip'] = metrics['route_path'][-1].get('ip', '')
+            fields['first_hop_ip'] = ips[0]
+            fields['last_hop_ip'] = ips[-1]
         
         return fields
     
-    def _extract_geolocation_fields(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract and validate geolocation-related fields."""
-        fields = {}
-        
-        # IP addresses
-        if 'target_ip' in metrics:
-            fields['target_ip'] = str(metrics['target_ip'])
-        if 'source_ip' in metrics:
-            fields['source_ip'] = str(metrics['source_ip'])
-        
-        # Target location
-        if 'target_latitude' in metrics:
-            fields['target_latitude'] = float(metrics['target_latitude'])
-        if 'target_longitude' in metrics:
-            fields['target_longitude'] = float(metrics['target_longitude'])
-        if 'target_country' in metrics:
-            fields['target_country'] = str(metrics['target_country'])
-        if 'target_region' in metrics:
-            fields['target_region'] = str(metrics['target_region'])
-        if 'target_city' in metrics:
-            fields['target_city'] = str(metrics['target_city'])
-        if 'target_timezone' in metrics:
-            fields['target_timezone'] = str(metrics['target_timezone'])
-        if 'target_isp' in metrics:
-            fields['target_isp'] = str(metrics['target_isp'])
-        
-        # Source location
-        if 'source_latitude' in metrics:
-            fields['source_latitude'] = float(metrics['source_latitude'])
-        if 'source_longitude' in metrics:
-            fields['source_longitude'] = float(metrics['source_longitude'])
-        if 'source_country' in metrics:
-            fields['source_country'] = str(metrics['source_country'])
-        if 'source_region' in metrics:
-            fields['source_region'] = str(metrics['source_region'])
-        if 'source_city' in metrics:
-            fields['source_city'] = str(metrics['source_city'])
-        if 'source_timezone' in metrics:
-            fields['source_timezone'] = str(metrics['source_timezone'])
-        if 'source_isp' in metrics:
-            fields['source_isp'] = str(metrics['source_isp'])
-        
-        # Distance
-        if 'distance_km' in metrics:
-            fields['distance_km'] = float(metrics['distance_km'])
+    def _extract_geolocation_fields(self, metrics: Dict[str, Any],
+                                    fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract and validate geolocation-related fields, adding them to fields if given."""
+        if fields is None:
+            fields = {}
+        
+        for name, convert in _GEO_FIELDS:
+            value = metrics.get(name)
+            if value is not None:
+                fields[name] = convert(value)
         
         return fields
     
@@ -958,80 +1442,122 @@ class NetworkTelemetry:
             fields = metrics.get('fields', {})
             target = metrics.get('tags', {}).get('target', 'unknown')
             
-            summary_parts = [f"Target: {target}"]
+            rtt_avg = fields.get('rtt_avg')
+            packet_loss = fields.get('packet_loss')
+            hop_count = fields.get('hop_count')
             
-            if 'rtt_avg' in fields:
-                summary_parts.append(f"RTT: {fields['rtt_avg']:.2f}ms")
-            if 'packet_loss' in fields:
-                summary_parts.append(f"Loss: {fields['packet_loss']}%")
-            if 'hop_count' in fields:
-                summary_parts.append(f"Hops: {fields['hop_count']}")
-            
-            return " | ".join(summary_parts)
+            return " | ".join(part for part in (
+                f"Target: {target}",
+                f"RTT: {rtt_avg:.2f}ms" if rtt_avg is not None else None,
+                f"Loss: {packet_loss}%" if packet_loss is not None else None,
+                f"Hops: {hop_count}" if hop_count is not None else None,
+            ) if part)
             
         except Exception as e:
             self.logger.error(f"Error generating metrics summary: {e}")
             return "Metrics collected successfully"
     
     async def test_connectivity(self) -> bool:
-        """Test basic connectivity to target."""
+        """
+        Test basic connectivity to target.
+        
+        Results are reused for config.connectivity_cache_ttl seconds.
+        """
+        target = self.target_fqdn
+        entry = self._conn_cache.get(target)
+        if entry is not None and time.monotonic() - entry[0] < self.config.connectivity_cache_ttl:
+            return entry[1]
+        
         try:
-            cmd = ['ping', '-c', '1', '-W', '5000', self.target_fqdn]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            return process.returncode == 0
+            reachable = await self._probe_connectivity(target)
+            self._conn_cache[target] = (time.monotonic(), reachable)
+            return reachable
             
         except Exception as e:
             self.logger.error(f"Connectivity test failed: {e}")
             return False
     
+    async def _probe_connectivity(self, target: str) -> bool:
+        """Send a single echo request to target, in-process when ICMP sockets are allowed."""
+        if self._state.icmp_ping:
+            target_ip = await self._resolve_hostname(target)
+            if target_ip and ':' not in target_ip:
+                try:
+                    metrics = await self._ping(target_ip, count=1, timeout=5)
+                    return metrics['packets_received'] > 0
+                except PermissionError:
+                    self.logger.info("ICMP sockets not permitted, falling back to ping command")
+                    self._state.icmp_ping = False
+        
+        cmd = ['ping', '-c', '1', '-W', '5000', target]
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        stdout, stderr = await process.communicate()
+        return process.returncode == 0
+    
     async def cleanup(self):
         """Cleanup resources."""
         if self.influx_client:
             await self.influx_client.close()
 
 
+# Guards the one-time handler setup for the shared 'telemetry_service' logger
+_LOG_INIT_LOCK = threading.Lock()
+_LOG_INITIALIZED = False
+
+
+def _init_service_logger() -> logging.Logger:
+    """Attach console and file handlers to the service logger once per process."""
+    global _LOG_INITIALIZED
+    logger = logging.getLogger('telemetry_service')
+    
+    with _LOG_INIT_LOCK:
+        if _LOG_INITIALIZED:
+            return logger
+        
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+        
+        # File handler
+        try:
+            os.makedirs('logs', exist_ok=True)
+            file_handler = logging.FileHandler('logs/telemetry_service.log')
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+        except Exception as e:
+            logger.warning(f"Could not create file handler: {e}")
+        
+        _LOG_INITIALIZED = True
+    
+    return logger
+
+
 class TelemetryService:
     """Integrated telemetry service with continuous monitoring and sample collection."""
     
     def __init__(self, config: Optional[Config] = None):
         """Initialize the telemetry service."""
-        self.config = config or Config()
+        self.config = config or get_config()
         self.logger = self._setup_logging()
         self.telemetry = NetworkTelemetry(self.config)
         self.running = False
+        self._stop_event = asyncio.Event()
         
     def _setup_logging(self) -> logging.Logger:
         """Set up logging configuration."""
-        logger = logging.getLogger('telemetry_service')
+        logger = _init_service_logger()
         logger.setLevel(getattr(logging, self.config.log_level))
-        
-        # Create formatters
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # Console handler
-        if not logger.handlers:
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-            
-            # File handler
-            try:
-                os.makedirs('logs', exist_ok=True)
-                file_handler = logging.FileHandler('logs/telemetry_service.log')
-                file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-            except Exception as e:
-                logger.warning(f"Could not create file handler: {e}")
-        
         return logger
     
     async def initialize(self) -> bool:
@@ -1061,8 +1587,8 @@ class TelemetryService:
         """Run continuous monitoring service."""
         self.running = True
         self.logger.info("Starting continuous telemetry monitoring...")
-        self.logger.info(f"Target: {self.config.target_fqdn}")
-        self.logger.info(f"Interval: {self.config.monitoring_interval} seconds")
+        self.logger.info("Target: %s", self.config.target_fqdn)
+        self.logger.info("Interval: %s seconds", self.config.monitoring_interval)
         
         # Initialize service first
         if not await self.initialize():
@@ -1073,25 +1599,25 @@ class TelemetryService:
         
         while self.running:
             try:
-                self.logger.info(f"Starting collection cycle #{collection_count + 1}")
+                self.logger.info("Starting collection cycle #%d", collection_count + 1)
                 
                 # Collect and store metrics
                 success = await self.telemetry.collect_and_store_metrics()
                 
                 if success:
                     collection_count += 1
-                    self.logger.info(f"✅ Collection cycle #{collection_count} completed successfully")
+                    self.logger.info("✅ Collection cycle #%d completed successfully", collection_count)
                 else:
-                    self.logger.warning(f"❌ Collection cycle #{collection_count + 1} failed")
+                    self.logger.warning("❌ Collection cycle #%d failed", collection_count + 1)
                 
                 # Wait for next cycle
-                await asyncio.sleep(self.config.monitoring_interval)
+                await self._wait_for_stop(self.config.monitoring_interval)
                 
             except Exception as e:
                 self.logger.error(f"Error in monitoring cycle: {e}")
-                await asyncio.sleep(10)  # Wait before retrying
+                await self._wait_for_stop(10)  # Wait before retrying
         
-        self.logger.info(f"Continuous monitoring stopped after {collection_count} successful collections")
+        self.logger.info("Continuous monitoring stopped after %d successful collections", collection_count)
     
     async def collect_sample_data(self, targets: List[str] = None) -> int:
         """Collect sample geolocation data from multiple targets."""
@@ -1105,49 +1631,25 @@ class TelemetryService:
             ]
         
         self.logger.info("Starting sample data collection...")
-        self.logger.info(f"Targets: {', '.join(targets)}")
+        self.logger.info("Targets: %s", ', '.join(targets))
         
         successful_collections = 0
         
-        for i, target in enumerate(targets):
-            try:
-                self.logger.info(f"Processing {target} ({i+1}/{len(targets)})")
-                
-                # Update target configuration
-                original_target = self.config.target_fqdn
-                self.config.target_fqdn = target
-                self.telemetry.target_fqdn = target
-                
-                # Initialize for this target
-                if not await self.telemetry.initialize():
-                    self.logger.error(f"Failed to initialize telemetry for {target}")
-                    continue
-                
-                # Collect and store metrics
-                success = await self.telemetry.collect_and_store_metrics()
-                
-                if success:
-                    self.logger.info(f"✅ Successfully collected data for {target}")
-                    successful_collections += 1
-                else:
-                    self.logger.warning(f"❌ Failed to collect data for {target}")
-                
-                # Cleanup for this target
-                await self.telemetry.cleanup()
-                
-                # Brief pause between collections
-                if i < len(targets) - 1:
-                    await asyncio.sleep(3)
-                    
-            except Exception as e:
-                self.logger.error(f"Error processing {target}: {e}")
-                continue
-            finally:
-                # Restore original target
-                self.config.target_fqdn = original_target
-                self.telemetry.target_fqdn = original_target
+        try:
+            if not await self.telemetry.initialize():
+                self.logger.error("Failed to initialize telemetry for sample collection")
+                return 0
+            
+            # Collect every target concurrently; metrics are derived for the
+            # whole batch and stored in a single write
+            successful_collections = await self.telemetry.collect_and_store_metrics_batch(targets)
+            
+        except Exception as e:
+            self.logger.error(f"Error collecting sample data: {e}")
+        finally:
+            await self.telemetry.cleanup()
         
-        self.logger.info(f"Sample collection complete: {successful_collections}/{len(targets)} successful")
+        self.logger.info("Sample collection complete: %d/%d successful", successful_collections, len(targets))
         return successful_collections
     
     async def run_single_collection(self) -> bool:
@@ -1181,33 +1683,53 @@ class TelemetryService:
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
     
+    async def _wait_for_stop(self, timeout: float):
+        """Sleep for up to ``timeout`` seconds, returning early once stop() is called."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
     def stop(self):
         """Stop the continuous service."""
         self.running = False
+        self._stop_event.set()
         self.logger.info("Service stop requested")
 
 
 # Service runner functions for backward compatibility and easy integration
+
+# Environment defaults for the runner functions; set variables always win
+_ENV_DEFAULTS = {
+    'TARGET_FQDN': 'google.com',
+    'INFLUXDB_URL': 'http://localhost:8086',
+    'INFLUXDB_ORG': 'nflx',
+    'INFLUXDB_BUCKET': 'default',
+    'LOG_LEVEL': 'INFO',
+}
+_CONTINUOUS_ENV_DEFAULTS = {**_ENV_DEFAULTS, 'MONITORING_INTERVAL': '300'}  # 5 minutes
+
+
+def _apply_env_defaults(defaults: Dict[str, str]):
+    """Set each default that is not already in the environment."""
+    environ = os.environ
+    environ.update({name: value for name, value in defaults.items() if name not in environ})
+
+
 async def run_continuous_service():
     """Run the continuous telemetry service."""
-    # Set up environment defaults
-    os.environ.setdefault('TARGET_FQDN', 'google.com')
-    os.environ.setdefault('MONITORING_INTERVAL', '300')  # 5 minutes
-    os.environ.setdefault('INFLUXDB_URL', 'http://localhost:8086')
-    os.environ.setdefault('INFLUXDB_ORG', 'nflx')
-    os.environ.setdefault('INFLUXDB_BUCKET', 'default')
-    os.environ.setdefault('LOG_LEVEL', 'INFO')
+    _apply_env_defaults(_CONTINUOUS_ENV_DEFAULTS)
     
     # Create and run service
     service = TelemetryService()
     
-    # Set up signal handlers for graceful shutdown
-    def signal_handler(signum, frame):
-        service.logger.info(f"Received signal {signum}, stopping service...")
-        service.stop()
-    
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Handle shutdown signals on the event loop rather than in signal context
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, service.stop)
+        except NotImplementedError:  # e.g. Windows event loops
+            signal.signal(signum, lambda *_: loop.call_soon_threadsafe(service.stop))
     
     try:
         await service.run_continuous()
@@ -1221,11 +1743,7 @@ async def run_continuous_service():
 
 async def collect_sample_data():
     """Collect sample geolocation data from multiple targets."""
-    # Set up environment defaults
-    os.environ.setdefault('INFLUXDB_URL', 'http://localhost:8086')
-    os.environ.setdefault('INFLUXDB_ORG', 'nflx')
-    os.environ.setdefault('INFLUXDB_BUCKET', 'default')
-    os.environ.setdefault('LOG_LEVEL', 'INFO')
+    _apply_env_defaults(_ENV_DEFAULTS)
     
     # Create service and collect samples
     service = TelemetryService()
@@ -1250,12 +1768,7 @@ async def collect_sample_data():
 
 async def run_single_collection():
     """Run a single collection cycle."""
-    # Set up environment defaults
-    os.environ.setdefault('TARGET_FQDN', 'google.com')
-    os.environ.setdefault('INFLUXDB_URL', 'http://localhost:8086')
-    os.environ.setdefault('INFLUXDB_ORG', 'nflx')
-    os.environ.setdefault('INFLUXDB_BUCKET', 'default')
-    os.environ.setdefault('LOG_LEVEL', 'INFO')
+    _apply_env_defaults(_ENV_DEFAULTS)
     
     # Create service and run single collection
     service = TelemetryService()
@@ -2,72 +2,103 @@
 Test configuration and fixtures.
 """
 
+import importlib
 import pytest
-import asyncio
-import tempfile
-import os
-from unittest.mock import MagicMock
+import pytest_asyncio
+import shutil
+from types import MappingProxyType
 
 from src.config import Config
-from src.network_monitor import NetworkMonitor
-from src.influx_client import InfluxDBClient
-from src.data_collector import DataCollector
 
 
-@pytest.fixture
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Service modules imported up front so no single test absorbs the cold import
+_WARMUP_MODULES = ('src.config', 'src.database', 'src.telemetry', 'src.main')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session", autouse=True)
+def _warmup():
+    """Import the service modules once at session start; import errors surface here."""
+    for name in _WARMUP_MODULES:
+        importlib.import_module(name)
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the single session-scoped event loop."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+# Environment the test configuration is loaded from
+_TEST_ENV = {
+    'TARGET_FQDN': 'example.com',
+    'MONITORING_INTERVAL': '30',
+    'INFLUXDB_URL': 'http://localhost:8086',
+    'INFLUXDB_TOKEN': 'test-token',
+    'INFLUXDB_ORG': 'test-org',
+    'INFLUXDB_BUCKET': 'test-bucket',
+    'LOG_LEVEL': 'DEBUG',
+}
+
+
+@pytest.fixture(scope="session")
 def test_config():
-    """Create a test configuration."""
-    # Set test environment variables
-    os.environ['TARGET_FQDN'] = 'example.com'
-    os.environ['MONITORING_INTERVAL'] = '30'
-    os.environ['INFLUXDB_URL'] = 'http://localhost:8086'
-    os.environ['INFLUXDB_TOKEN'] = 'test-token'
-    os.environ['INFLUXDB_ORG'] = 'test-org'
-    os.environ['INFLUXDB_BUCKET'] = 'test-bucket'
-    os.environ['LOG_LEVEL'] = 'DEBUG'
+    """Create a test configuration, built once and shared by the session."""
+    # MonkeyPatch.context() restores the environment even if Config() raises;
+    # the function-scoped monkeypatch fixture can't back a session fixture
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in _TEST_ENV.items():
+            mp.setenv(key, value)
+        return Config()
+
+
+class _FakeInflux:
+    """Minimal InfluxDB client stand-in that records calls instead of writing."""
     
-    config = Config()
+    def __init__(self):
+        self.calls = []
     
-    # Clean up environment variables
-    for key in ['TARGET_FQDN', 'MONITORING_INTERVAL', 'INFLUXDB_URL', 
-                'INFLUXDB_TOKEN', 'INFLUXDB_ORG', 'INFLUXDB_BUCKET', 'LOG_LEVEL']:
-        if key in os.environ:
-            del os.environ[key]
+    def count(self, name: str) -> int:
+        """Return how many times the named method was called."""
+        return sum(1 for call in self.calls if call[0] == name)
     
-    return config
+    def preload_field_keys(self, keys):
+        pass
+    
+    async def initialize(self) -> bool:
+        self.calls.append(('initialize',))
+        return True
+    
+    async def write_metrics(self, metrics) -> bool:
+        self.calls.append(('write_metrics', metrics))
+        return True
+    
+    async def close(self):
+        self.calls.append(('close',))
 
 
 @pytest.fixture
-def network_monitor(test_config):
-    """Create a network monitor instance."""
-    return NetworkMonitor(test_config.target_fqdn)
+def mock_influx_client():
+    """Create a stub InfluxDB client."""
+    return _FakeInflux()
 
 
-@pytest.fixture
-def mock_influx_client():
-    """Create a mock InfluxDB client."""
-    mock_client = MagicMock(spec=InfluxDBClient)
-    mock_client.initialize.return_value = True
-    mock_client.write_metrics.return_value = True
-    mock_client.close.return_value = None
-    return mock_client
+@pytest.fixture(scope="session")
+def _template_dir(tmp_path_factory):
+    """On-disk test data, populated once per session."""
+    template = tmp_path_factory.mktemp("template")
+    (template / "logs").mkdir()
+    return template
 
 
 @pytest.fixture
-def data_collector(mock_influx_client, test_config):
-    """Create a data collector instance."""
-    return DataCollector(mock_influx_client, test_config)
+def workdir(_template_dir, tmp_path):
+    """Per-test copy of the template directory that tests may modify."""
+    return shutil.copytree(_template_dir, tmp_path / "work")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ping_output():
     """Sample ping command output for testing."""
     return """PING example.com (93.184.216.34) 56(84) bytes of data.
@@ -83,7 +114,7 @@ rtt min/avg/max/mdev = 22.806/23.320/24.089/0.482 ms
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_traceroute_output():
     """Sample traceroute command output for testing."""
     return """traceroute to example.com (93.184.216.34), 30 hops max, 60 byte packets
@@ -94,25 +125,28 @@ def sample_traceroute_output():
 """
 
 
-@pytest.fixture
+# Read-only sample metrics; the proxies and tuples make accidental writes raise
+_SAMPLE_METRICS = MappingProxyType({
+    'timestamp': 1640995200,
+    'target': 'example.com',
+    'collection_duration': 2.5,
+    'rtt_min': 22.806,
+    'rtt_avg': 23.320,
+    'rtt_max': 24.089,
+    'rtt_mdev': 0.482,
+    'packet_loss': 0.0,
+    'packets_transmitted': 5,
+    'packets_received': 5,
+    'hop_count': 4,
+    'route_path': MappingProxyType({
+        'hops': (1, 2, 3, 4),
+        'ips': ('192.168.1.1', '10.0.0.1', '172.16.0.1', '93.184.216.34'),
+        'avg_times': (1.271, 12.345, 23.456, 24.567)
+    })
+})
+
+
+@pytest.fixture(scope="session")
 def sample_metrics():
-    """Sample network metrics for testing."""
-    return {
-        'timestamp': 1640995200,
-        'target': 'example.com',
-        'collection_duration': 2.5,
-        'rtt_min': 22.806,
-        'rtt_avg': 23.320,
-        'rtt_max': 24.089,
-        'rtt_mdev': 0.482,
-        'packet_loss': 0.0,
-        'packets_transmitted': 5,
-        'packets_received': 5,
-        'hop_count': 4,
-        'route_path': [
-            {'hop': 1, 'ip': '192.168.1.1', 'raw_data': '192.168.1.1  1.234 ms  1.123 ms  1.456 ms'},
-            {'hop': 2, 'ip': '10.0.0.1', 'raw_data': '10.0.0.1  12.345 ms  12.234 ms  12.456 ms'},
-            {'hop': 3, 'ip': '172.16.0.1', 'raw_data': '172.16.0.1  23.456 ms  23.345 ms  23.567 ms'},
-            {'hop': 4, 'ip': '93.184.216.34', 'raw_data': '93.184.216.34  24.567 ms  24.456 ms  24.678 ms'}
-        ]
-    }
+    """Sample network metrics for testing; copy before modifying."""
+    return _SAMPLE_METRICS
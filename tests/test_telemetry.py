@@ -6,7 +6,8 @@ Tests all core functionality in a single file for simplicity.
 
 import asyncio
 import pytest
-from unittest.mock import MagicMock, patch, AsyncMock
+from dataclasses import dataclass
+from unittest.mock import patch
 from typing import Dict, Any
 
 from src.config import Config
@@ -14,6 +15,62 @@ from src.telemetry import NetworkTelemetry
 from src.database import InfluxDBClient
 
 
+_PING_SAMPLE = """PING google.com (172.217.164.14) 56(84) bytes of data.
+64 bytes from 172.217.164.14: icmp_seq=1 ttl=117 time=23.2 ms
+64 bytes from 172.217.164.14: icmp_seq=2 ttl=117 time=24.1 ms
+64 bytes from 172.217.164.14: icmp_seq=3 ttl=117 time=22.8 ms
+64 bytes from 172.217.164.14: icmp_seq=4 ttl=117 time=23.5 ms
+
+--- google.com ping statistics ---
+4 packets transmitted, 4 received, 0% packet loss, time 3004ms
+rtt min/avg/max/mdev = 22.800/23.400/24.100/0.500 ms"""
+
+_TRACE_SAMPLE = """traceroute to google.com (172.217.164.14), 30 hops max, 60 byte packets
+ 1  192.168.1.1 (192.168.1.1)  1.234 ms  1.123 ms  1.456 ms
+ 2  10.0.0.1 (10.0.0.1)  12.345 ms  12.234 ms  12.456 ms
+ 3  172.217.164.14 (172.217.164.14)  23.456 ms  23.345 ms  23.567 ms"""
+
+# Subprocess output is bytes; encode the samples once
+_PING_BYTES = _PING_SAMPLE.encode('ascii')
+_TRACE_BYTES = _TRACE_SAMPLE.encode('ascii')
+
+
+@dataclass(slots=True, frozen=True)
+class _FakeProc:
+    """Completed subprocess stand-in returning canned output."""
+    stdout: bytes
+    stderr: bytes = b''
+    returncode: int = 0
+    
+    async def communicate(self):
+        return self.stdout, self.stderr
+
+
+def _returning(proc: _FakeProc):
+    """Build a create_subprocess_exec replacement that always yields proc."""
+    async def create_subprocess_exec(*args, **kwargs):
+        return proc
+    return create_subprocess_exec
+
+
+async def _ok(*args, **kwargs):
+    return True
+
+
+async def _fail(*args, **kwargs):
+    return False
+
+
+@pytest.fixture(scope="session")
+def parsed_outputs():
+    """Ping and traceroute samples, each parsed once per session."""
+    telemetry = NetworkTelemetry(Config())
+    return {
+        'ping': telemetry._parse_ping_output(_PING_BYTES),
+        'trace': telemetry._parse_traceroute_output(_TRACE_SAMPLE),
+    }
+
+
 class TestNetworkTelemetry:
     """Test cases for NetworkTelemetry class."""
     
@@ -23,67 +80,44 @@ class TestNetworkTelemetry:
         return Config()
     
     @pytest.fixture
-    def mock_influx(self):
-        """Create mock InfluxDB client."""
-        mock = MagicMock()
-        mock.initialize = AsyncMock(return_value=True)
-        mock.write_metrics = AsyncMock(return_value=True)
-        mock.close = AsyncMock()
-        return mock
+    def mock_influx(self, mock_influx_client):
+        """Create stub InfluxDB client."""
+        return mock_influx_client
     
     @pytest.fixture
     def telemetry(self, config):
-        """Create NetworkTelemetry instance."""
-        return NetworkTelemetry(config)
-    
-    @pytest.fixture
-    def sample_ping_output(self):
-        """Sample ping output for testing."""
-        return """PING google.com (172.217.164.14) 56(84) bytes of data.
-64 bytes from 172.217.164.14: icmp_seq=1 ttl=117 time=23.2 ms
-64 bytes from 172.217.164.14: icmp_seq=2 ttl=117 time=24.1 ms
-64 bytes from 172.217.164.14: icmp_seq=3 ttl=117 time=22.8 ms
-64 bytes from 172.217.164.14: icmp_seq=4 ttl=117 time=23.5 ms
-
---- google.com ping statistics ---
-4 packets transmitted, 4 received, 0% packet loss, time 3004ms
-rtt min/avg/max/mdev = 22.800/23.400/24.100/0.500 ms"""
-    
-    @pytest.fixture
-    def sample_traceroute_output(self):
-        """Sample traceroute output for testing."""
-        return """traceroute to google.com (172.217.164.14), 30 hops max, 60 byte packets
- 1  192.168.1.1 (192.168.1.1)  1.234 ms  1.123 ms  1.456 ms
- 2  10.0.0.1 (10.0.0.1)  12.345 ms  12.234 ms  12.456 ms
- 3  172.217.164.14 (172.217.164.14)  23.456 ms  23.345 ms  23.567 ms"""
+        """Create NetworkTelemetry instance using the ping/traceroute commands."""
+        telemetry = NetworkTelemetry(config)
+        telemetry._state.icmp_ping = False
+        telemetry._state.raw_traceroute = False
+        return telemetry
     
     async def test_initialization(self, telemetry, mock_influx):
         """Test telemetry initialization."""
         with patch('src.telemetry.InfluxDBClient', return_value=mock_influx):
             assert await telemetry.initialize() is True
-            mock_influx.initialize.assert_called_once()
+            assert mock_influx.count('initialize') == 1
     
-    async def test_ping_parsing(self, telemetry, sample_ping_output):
-        """Test ping output parsing."""
-        metrics = telemetry._parse_ping_output(sample_ping_output)
+    @pytest.mark.parametrize('kind,path,expected', [
+        ('ping', ('rtt_min',), 22.8),
+        ('ping', ('rtt_avg',), 23.4),
+        ('ping', ('rtt_max',), 24.1),
+        ('ping', ('rtt_mdev',), 0.5),
+        ('ping', ('packet_loss',), 0.0),
+        ('ping', ('packets_transmitted',), 4),
+        ('ping', ('packets_received',), 4),
+        ('trace', ('hop_count',), 3),
+        ('trace', ('route_path', 'hops'), [1, 2, 3]),
+        ('trace', ('route_path', 'ips'), ['192.168.1.1', '10.0.0.1', '172.217.164.14']),
+        ('trace', ('route_path', 'avg_times'), pytest.approx([1.271, 12.345, 23.456])),
+    ])
+    def test_output_parsing(self, parsed_outputs, kind, path, expected):
+        """Test ping and traceroute output parsing."""
+        value = parsed_outputs[kind]
+        for key in path:
+            value = value[key]
         
-        assert metrics['rtt_min'] == 22.8
-        assert metrics['rtt_avg'] == 23.4
-        assert metrics['rtt_max'] == 24.1
-        assert metrics['rtt_mdev'] == 0.5
-        assert metrics['packet_loss'] == 0.0
-        assert metrics['packets_transmitted'] == 4
-        assert metrics['packets_received'] == 4
-    
-    async def test_traceroute_parsing(self, telemetry, sample_traceroute_output):
-        """Test traceroute output parsing."""
-        metrics = telemetry._parse_traceroute_output(sample_traceroute_output)
-        
-        assert metrics['hop_count'] == 3
-        assert len(metrics['route_path']) == 3
-        assert metrics['route_path'][0]['ip'] == '192.168.1.1'
-        assert metrics['route_path'][1]['ip'] == '10.0.0.1'
-        assert metrics['route_path'][2]['ip'] == '172.217.164.14'
+        assert value == expected
     
     async def test_metrics_processing(self, telemetry):
         """Test metrics processing."""
@@ -97,11 +131,11 @@ rtt min/avg/max/mdev = 22.800/23.400/24.100/0.500 ms"""
             'packets_transmitted': 4,
             'packets_received': 4,
             'hop_count': 3,
-            'route_path': [
-                {'hop': 1, 'ip': '192.168.1.1', 'avg_time': 1.271},
-                {'hop': 2, 'ip': '10.0.0.1', 'avg_time': 12.345},
-                {'hop': 3, 'ip': '172.217.164.14', 'avg_time': 23.456}
-            ]
+            'route_path': {
+                'hops': [1, 2, 3],
+                'ips': ['192.168.1.1', '10.0.0.1', '172.217.164.14'],
+                'avg_times': [1.271, 12.345, 23.456]
+            }
         }
         
         processed = telemetry._process_metrics(raw_metrics)
@@ -115,46 +149,63 @@ rtt min/avg/max/mdev = 22.800/23.400/24.100/0.500 ms"""
     
     async def test_connectivity_test(self, telemetry):
         """Test connectivity testing."""
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            mock_process = MagicMock()
-            mock_process.communicate = AsyncMock(return_value=(b'', b''))
-            mock_process.returncode = 0
-            mock_subprocess.return_value = mock_process
-            
+        with patch('asyncio.create_subprocess_exec', _returning(_FakeProc(b''))):
             result = await telemetry.test_connectivity()
             assert result is True
     
-    async def test_collect_and_store_metrics(self, telemetry, mock_influx, sample_ping_output, sample_traceroute_output):
+    async def test_collect_and_store_metrics(self, telemetry, mock_influx):
         """Test complete metrics collection and storage."""
         telemetry.influx_client = mock_influx
         
-        def subprocess_side_effect(*args, **kwargs):
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            
-            if 'ping' in args[0]:
-                mock_process.communicate = AsyncMock(return_value=(sample_ping_output.encode(), b''))
-            elif 'traceroute' in args[0]:
-                mock_process.communicate = AsyncMock(return_value=(sample_traceroute_output.encode(), b''))
-            
-            return mock_process
+        outputs = {'ping': _PING_BYTES, 'traceroute': _TRACE_BYTES}
+        
+        async def fake_create_subprocess_exec(*args, **kwargs):
+            return _FakeProc(outputs.get(args[0], b''))
         
-        with patch('asyncio.create_subprocess_exec', side_effect=subprocess_side_effect):
+        with patch('asyncio.create_subprocess_exec', fake_create_subprocess_exec):
             result = await telemetry.collect_and_store_metrics()
             
             assert result is True
-            mock_influx.write_metrics.assert_called_once()
+            assert mock_influx.count('write_metrics') == 1
+    
+    async def test_batch_shares_public_ip_lookup(self, telemetry, mock_influx):
+        """Test that per-target clones share one public IP lookup across batches."""
+        telemetry.influx_client = mock_influx
+        lookups = []
+        
+        async def fake_get_session():
+            lookups.append(1)
+        
+        async def fake_fetch_ip(session, url):
+            return '203.0.113.7'
+        
+        async def fake_resolve(hostname):
+            return '93.184.216.34'
+        
+        async def fake_ping():
+            return {'rtt_avg': 23.4, 'packet_loss': 0.0}
+        
+        async def no_data(*args, **kwargs):
+            return {}
+        
+        with patch.object(telemetry, '_get_session', fake_get_session), \
+             patch.object(telemetry, '_fetch_ip', fake_fetch_ip), \
+             patch.object(telemetry, '_resolve_hostname', fake_resolve), \
+             patch.object(telemetry, '_collect_ping_metrics', fake_ping), \
+             patch.object(telemetry, '_collect_traceroute_metrics', no_data), \
+             patch.object(telemetry, '_get_geolocation', no_data):
+            targets = ['example.com', 'example.org', 'example.net']
+            assert await telemetry.collect_and_store_metrics_batch(targets) == 3
+            assert await telemetry.collect_and_store_metrics_batch(targets) == 3
+        
+        assert len(lookups) == 1
     
     async def test_failed_metrics_collection(self, telemetry, mock_influx):
         """Test handling of failed metrics collection."""
         telemetry.influx_client = mock_influx
         
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            mock_process = MagicMock()
-            mock_process.communicate = AsyncMock(return_value=(b'', b'Command failed'))
-            mock_process.returncode = 1
-            mock_subprocess.return_value = mock_process
-            
+        failed = _FakeProc(b'', b'Command failed', returncode=1)
+        with patch('asyncio.create_subprocess_exec', _returning(failed)):
             result = await telemetry.collect_and_store_metrics()
             assert result is False
     
@@ -180,7 +231,7 @@ rtt min/avg/max/mdev = 22.800/23.400/24.100/0.500 ms"""
         telemetry.influx_client = mock_influx
         
         await telemetry.cleanup()
-        mock_influx.close.assert_called_once()
+        assert mock_influx.count('close') == 1
 
 
 class TestInfluxDBClient:
@@ -235,51 +286,56 @@ class TestConfiguration:
         assert config.influxdb_bucket == 'metrics'
         assert config.log_level == 'INFO'
     
-    def test_config_validation(self):
+    @pytest.mark.parametrize('overrides,message', [
+        ({'monitoring_interval': -1}, 'MONITORING_INTERVAL'),
+        ({'ping_count': 0}, 'PING_COUNT'),
+        ({'geo_prefix_bits': 33}, 'GEO_PREFIX_BITS'),
+        ({'target_fqdn': ''}, 'TARGET_FQDN'),
+    ])
+    def test_config_validation(self, overrides, message):
         """Test configuration validation."""
-        import os
-        
-        # Test with invalid monitoring interval
-        os.environ['MONITORING_INTERVAL'] = '-1'
-        
-        with pytest.raises(ValueError):
-            Config()
-        
-        # Cleanup
-        del os.environ['MONITORING_INTERVAL']
+        # Fields can be passed directly; only the rest are read from the environment
+        with pytest.raises(ValueError, match=message):
+            Config(**overrides)
 
 
 class TestIntegration:
     """Integration tests for the complete system."""
     
-    async def test_full_service_flow(self):
-        """Test complete service workflow."""
+    @pytest.fixture(autouse=True)
+    def _in_workdir(self, monkeypatch, workdir):
+        """Run the services from a scratch directory so their logs/ stay out of the repo."""
+        monkeypatch.chdir(workdir)
+    
+    @pytest.fixture
+    async def service(self, _in_workdir):
+        """Create a service and release its log handlers afterwards."""
         from src.main import NetworkTelemetryService
         
         service = NetworkTelemetryService()
-        
+        yield service
+        await service.cleanup()
+    
+    async def test_full_service_flow(self, service):
+        """Test complete service workflow."""
         # Test initialization without actually connecting
-        with patch('src.telemetry.NetworkTelemetry.initialize', return_value=True), \
-             patch('src.telemetry.NetworkTelemetry.test_connectivity', return_value=True):
+        with patch.object(NetworkTelemetry, 'initialize', new=_ok), \
+             patch.object(NetworkTelemetry, 'test_connectivity', new=_ok):
             
             assert await service.initialize() is True
         
         # Test monitoring cycle
-        with patch('src.telemetry.NetworkTelemetry.collect_and_store_metrics', return_value=True):
+        with patch.object(NetworkTelemetry, 'collect_and_store_metrics', new=_ok):
             await service.run_monitoring_cycle()
     
-    async def test_error_handling(self):
+    async def test_error_handling(self, service):
         """Test error handling in service."""
-        from src.main import NetworkTelemetryService
-        
-        service = NetworkTelemetryService()
-        
         # Test initialization failure
-        with patch('src.telemetry.NetworkTelemetry.initialize', return_value=False):
+        with patch.object(NetworkTelemetry, 'initialize', new=_fail):
             assert await service.initialize() is False
         
         # Test monitoring cycle failure
-        with patch('src.telemetry.NetworkTelemetry.collect_and_store_metrics', return_value=False):
+        with patch.object(NetworkTelemetry, 'collect_and_store_metrics', new=_fail):
             await service.run_monitoring_cycle()  # Should not raise exception
 
 